@@ -0,0 +1,25 @@
+"""Time of a KernelBank against applying its kernels one by one"""
+import timeit
+import numpy as np
+import kerpy
+
+IMAGE = np.random.default_rng(0).random((1080, 1920))
+BANKS = {
+    "feature extractor" : [
+        kerpy.diff.sobel(), kerpy.diff.prewitt(), kerpy.diff.laplacian(), kerpy.processing.unsharp(),
+        kerpy.processing.gaussian((5,5),(1,1)), kerpy.processing.gaussian((9,9),(2,2)),
+    ],
+    "3x3 operators" : [kerpy.diff.laplacian(), kerpy.processing.sharpen(), kerpy.processing.gaussian()],
+    "gaussian scales" : [kerpy.processing.gaussian((21,21),(s,s)) for s in (2,3,4,5)],
+}
+
+if __name__ == "__main__":
+    print(f"image {IMAGE.shape}, seconds, * marks the auto choice")
+    for name, kernels in BANKS.items():
+        bank = kerpy.KernelBank(kernels)
+        costs = bank.cost(IMAGE.shape)
+        times = {"one by one" : min(timeit.repeat(lambda k=kernels: [ker.apply(IMAGE) for ker in k], number=1, repeat=3))}
+        for method in costs:
+            times[("*" if method == min(costs, key=costs.get) else "") + method] = min(
+                timeit.repeat(lambda m=method, b=bank: b.apply(IMAGE, m), number=1, repeat=3))
+        print(f"{name:<20}", " ".join(f"{key}={value:.3f}" for key, value in times.items()))
@@ -0,0 +1,30 @@
+"""Throughput of every convolution method against the "auto" choice"""
+import timeit
+import numpy as np
+import kerpy
+from kerpy.convolution import convolve, cost
+
+IMAGE = np.random.default_rng(0).random((2160, 3840))
+KERNELS = {
+    "diff.sobel()" : kerpy.diff.sobel(),
+    "diff.laplacian()" : kerpy.diff.laplacian(),
+    "processing.gaussian((7,7),(2,2))" : kerpy.processing.gaussian((7,7),(2,2)),
+    "processing.gaussian((21,21),(5,5))" : kerpy.processing.gaussian((21,21),(5,5)),
+    "processing.mean((65,65))" : kerpy.processing.mean((65,65)),
+    "shapes.circle((21,21))" : kerpy.shapes.circle((21,21)),
+    "shapes.circle((21,21),(9,9))" : kerpy.shapes.circle((21,21),(9,9)),
+    "shapes.cross((21,21),(10,10))" : kerpy.shapes.cross((21,21),(10,10)),
+    "shapes.circle((41,41),(19,19),mode=\"outline\")" : kerpy.shapes.circle((41,41),(19,19),mode="outline"),
+    "processing.gaussian().stride(7)" : kerpy.processing.gaussian().stride(7),
+}
+
+if __name__ == "__main__":
+    print(f"image {IMAGE.shape}, Mpixel/s per method, * marks the auto choice")
+    for name, kernel in KERNELS.items():
+        costs = cost(IMAGE.shape, kernel)
+        rates = []
+        for method in costs:
+            seconds = min(timeit.repeat(lambda m=method: convolve(IMAGE, kernel, method=m), number=1, repeat=3))
+            star = "*" if method == min(costs, key=costs.get) else " "
+            rates.append(f"{star}{method}={IMAGE.size/seconds/1e6:.1f}")
+        print(f"{name:<36}", " ".join(rates))
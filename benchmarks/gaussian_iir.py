@@ -0,0 +1,22 @@
+"""Accuracy and time of processing.gaussian_iir against the FIR gaussian kernel"""
+import timeit
+import numpy as np
+import kerpy
+
+IMAGE = np.random.default_rng(0).random((1080, 1920))
+STDS = [1, 2, 3, 5, 10, 20, 40]
+
+if __name__ == "__main__":
+    print(f"image {IMAGE.shape}, max error relative to the max response, seconds")
+    for std in STDS:
+        size = 2 * int(np.ceil(4 * std)) + 1
+        kernel = kerpy.processing.gaussian((size, size), (std, std))
+        impulse = np.zeros((2 * size + 1, 2 * size + 1))
+        impulse[size, size] = 1
+        errors = []
+        for image in (impulse, IMAGE):
+            expected = kernel.apply(image)
+            errors.append(np.abs(kerpy.processing.gaussian_iir(image, std) - expected).max() / np.abs(expected).max())
+        fir = min(timeit.repeat(lambda k=kernel: k.apply(IMAGE), number=1, repeat=3))
+        iir = min(timeit.repeat(lambda s=std: kerpy.processing.gaussian_iir(IMAGE, s), number=1, repeat=3))
+        print(f"std={std:<4} impulse={errors[0]:.4f} image={errors[1]:.4f} fir={fir:.3f} iir={iir:.3f}")
@@ -0,0 +1,30 @@
+"""Time of the shifted-slice, van Herk/Gil-Werman, decomposed and bit-parallel
+erosions, to calibrate the costs of kerpy.morphology"""
+import timeit
+import numpy as np
+import kerpy
+
+IMAGES = {
+    "uint8": (np.random.default_rng(0).random((1080, 1920)) * 255).astype(np.uint8),
+    "float32": np.random.default_rng(0).random((1080, 1920), dtype=np.float32),
+    "bool": np.random.default_rng(0).random((1080, 1920)) > 0.5,
+}
+KERNELS = {
+    "square 3": kerpy.shapes.square((3, 3), (1, 1)),
+    "square 7": kerpy.shapes.square((7, 7), (3, 3)),
+    "square 21": kerpy.shapes.square((21, 21), (10, 10)),
+    "line 15": np.ones((1, 15)),
+    "circle 9": kerpy.shapes.circle((9, 9), (4, 4)),
+    "diamond 41": kerpy.shapes.diamond((41, 41), (20, 20)),
+    "circle 41": kerpy.shapes.circle((45, 45), (20, 20)),
+}
+TOL = 0.06
+
+if __name__ == "__main__":
+    print(f"seconds per erosion, estimated auto costs, decompositions within {TOL}")
+    for dtype, image in IMAGES.items():
+        for name, kernel in KERNELS.items():
+            costs = kerpy.morphology.cost(kernel, TOL, image.dtype)
+            times = {method: min(timeit.repeat(lambda m=method, k=kernel: kerpy.morphology.erode(image, k, m, TOL), number=1, repeat=3))
+                     for method in costs}
+            print(f"{dtype:8} {name:10}", "  ".join(f"{m}={t:.4f} ({costs[m]:.0f})" for m, t in times.items()))
@@ -0,0 +1,22 @@
+"""Frame rate of a fixed kernel applied to a video with and without FFT plans"""
+import timeit
+import numpy as np
+import kerpy
+from kerpy.convolution import FFTPlan, PLAN_CACHE
+
+FRAMES = np.random.default_rng(0).random((16, 720, 1280)).astype(np.float32)
+KERNELS = {
+    "processing.gaussian((31,31),(5,5))" : kerpy.processing.gaussian((31,31),(5,5)),
+    "shapes.circle((21,21),(9,9))" : kerpy.shapes.circle((21,21),(9,9)),
+}
+
+if __name__ == "__main__":
+    print(f"{len(FRAMES)} frames of {FRAMES.shape[1:]}, frames per second")
+    for name, kernel in KERNELS.items():
+        unplanned = min(timeit.repeat(
+            lambda k=kernel: [FFTPlan(k, f.shape, f.dtype).execute(f) for f in FRAMES], number=1, repeat=3))
+        fft_plan = kernel.plan(FRAMES.shape, FRAMES.dtype)
+        planned = min(timeit.repeat(lambda p=fft_plan: [p.execute(f) for f in FRAMES], number=1, repeat=3))
+        batched = min(timeit.repeat(lambda p=fft_plan: p.execute_batch(FRAMES), number=1, repeat=3))
+        print(f"{name:<36} unplanned={len(FRAMES)/unplanned:.1f} planned={len(FRAMES)/planned:.1f} batched={len(FRAMES)/batched:.1f}")
+    print(PLAN_CACHE.info())
@@ -0,0 +1,22 @@
+"""Time of the pyramids and scale-space of kerpy.pyramid against blurring the
+full resolution image for every level"""
+import timeit
+import numpy as np
+import kerpy
+
+IMAGE = np.random.default_rng(0).random((1080, 1920), dtype=np.float32)
+
+if __name__ == "__main__":
+    kernel = kerpy.processing.gaussian((9, 9), (1, 1), factored=True)
+    tasks = {
+        "full resolution blur": lambda: kernel.apply(IMAGE),
+        "gaussian pyramid": lambda: kerpy.pyramid.gaussian_pyramid(IMAGE),
+        "laplacian pyramid": lambda: kerpy.pyramid.laplacian_pyramid(IMAGE),
+        "scale-space": lambda: kerpy.pyramid.scale_space(IMAGE),
+        "scale-space from scratch": lambda: [
+            kerpy.processing.gaussian_iir(IMAGE, 1.6 * 2**(index / 3)) for index in range(6)
+        ],
+    }
+    print(f"image {IMAGE.shape}, seconds")
+    for name, task in tasks.items():
+        print(f"{name:26} {min(timeit.repeat(task, number=1, repeat=3)):.3f}")
@@ -0,0 +1,18 @@
+"""Time of the median filter of kerpy.rank with growing circle footprints, by
+sliding histograms for uint8 images and by partitions for float32 images"""
+import timeit
+import numpy as np
+import kerpy
+
+IMAGES = {
+    "uint8": (np.random.default_rng(0).random((540, 960)) * 255).astype(np.uint8),
+    "float32": np.random.default_rng(0).random((540, 960), dtype=np.float32),
+}
+RADII = [1, 3, 5, 10, 20]
+
+if __name__ == "__main__":
+    print(f"image {IMAGES['uint8'].shape}, seconds per median")
+    for radius in RADII:
+        kernel = kerpy.shapes.circle((2 * radius + 3, 2 * radius + 3), (radius, radius))
+        times = {name: min(timeit.repeat(lambda i=image: kerpy.rank.median(i, kernel), number=1, repeat=2)) for name, image in IMAGES.items()}
+        print(f"radius={radius:<3} taps={kernel.nnz:<5}", "  ".join(f"{name}={time:.3f}" for name, time in times.items()))
@@ -0,0 +1,26 @@
+"""Scaling of Kernel.apply from one thread to all the cores"""
+import os
+import sys
+import timeit
+import numpy as np
+import kerpy
+
+IMAGE = np.random.default_rng(0).random((4000, 5000))
+KERNELS = {
+    "diff.sobel()" : kerpy.diff.sobel(),
+    "diff.laplacian()" : kerpy.diff.laplacian(),
+    "processing.gaussian((21,21),(5,5))" : kerpy.processing.gaussian((21,21),(5,5)),
+    "processing.mean((7,7))" : kerpy.processing.mean((7,7)),
+    "shapes.circle((21,21),(9,9))" : kerpy.shapes.circle((21,21),(9,9)),
+}
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    workers = sorted({2**i for i in range(max_workers.bit_length())} | {max_workers})
+    print(f"image {IMAGE.shape}, speedup over one thread for", workers, "threads")
+    for name, kernel in KERNELS.items():
+        times = [
+            min(timeit.repeat(lambda w=w: kernel.apply(IMAGE, workers=w), number=1, repeat=3))
+            for w in workers
+        ]
+        print(f"{name:<36}", " ".join(f"{times[0]/t:.2f}" for t in times))
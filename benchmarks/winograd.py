@@ -0,0 +1,36 @@
+"""Multiplications and rounding errors of the Winograd method on 3x3 kernels"""
+import numpy as np
+import kerpy
+from kerpy.convolution import WINOGRAD_G, convolve
+
+KERNELS = {
+    "diff.sobel()" : kerpy.diff.sobel(),
+    "diff.prewitt()" : kerpy.diff.prewitt(),
+    "diff.laplacian()" : kerpy.diff.laplacian(),
+    "processing.sharpen()" : kerpy.processing.sharpen(),
+    "processing.unsharp()" : kerpy.processing.unsharp(),
+    "processing.gaussian()" : kerpy.processing.gaussian(),
+}
+IMAGE = np.random.default_rng(0).uniform(-1, 1, (512, 512))
+
+def multiplications(ker):
+    r"""Multiplications per output pixel of the direct and Winograd methods"""
+    parts = [f(ker) for f in (np.real, np.imag) if np.any(f(ker))]
+    direct = sum(np.count_nonzero(part) for part in parts)
+    winograd = sum(np.count_nonzero(np.round(WINOGRAD_G @ part @ WINOGRAD_G.T, 12)) for part in parts) / 4
+    return direct, winograd
+
+if __name__ == "__main__":
+    print("multiplications per pixel, and max error in eps * sum|k| * max|x| units")
+    for name, kernel in KERNELS.items():
+        ker = kernel.numpy.astype(np.result_type(kernel.numpy, np.float64))
+        exact = convolve(IMAGE.astype(np.longdouble), ker.astype(np.result_type(ker, np.longdouble)), method="direct")
+        scale = np.abs(ker).sum() * np.abs(IMAGE).max()
+        errors = []
+        for dtype in (np.float32, np.float64):
+            for method in ("direct", "winograd"):
+                precision = np.result_type(np.complex64 if ker.dtype.kind == "c" else np.float32, dtype)
+                result = convolve(IMAGE.astype(dtype), ker.astype(precision), method=method)
+                errors.append(f"{dtype.__name__} {method}={np.abs(result - exact).max() / scale / np.finfo(dtype).eps:.2f}")
+        direct, winograd = multiplications(ker)
+        print(f"{name:<24} direct={direct} winograd={winograd:g}", " ".join(errors))
@@ -1,6 +1,10 @@
 """Root of the KerPy module"""
-from . import (diff, processing, shapes, objs)
-from .objs.Kernel import Kernel
+from . import (diff, processing, shapes, objs, convolution, batch, gradient, morphology, rank, pyramid)
+from .objs.Kernel import Kernel, memoize
+from .objs.SeparableKernel import SeparableKernel
+from .objs.SparseKernel import SparseKernel
+from .objs.FrozenKernel import FrozenKernel
+from .objs.KernelBank import KernelBank
 
 from . import _version
 __version__ = _version.get_versions()['version']
@@ -0,0 +1,71 @@
+"""Apply kernels to stacks of images in worker processes"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+from .convolution import convolve, _as_kernel, _result_dtype, _window
+
+_WORKER = {}
+
+def _attach(images, responses, kernels, options):
+    r"""Initializer of the workers: attaches the shared blocks and keeps the kernels."""
+    for key, (name, shape, dtype) in (("images", images), ("responses", responses)):
+        memory = SharedMemory(name=name)
+        _WORKER[key] = (memory, np.ndarray(shape, dtype, buffer=memory.buf))
+    _WORKER["kernels"], _WORKER["options"] = kernels, options
+
+def _run(index, start, stop):
+    r"""Convolves the images start:stop with the kernel index, in place in the shared responses."""
+    images, responses = _WORKER["images"][1], _WORKER["responses"][1]
+    responses[start:stop, index] = convolve(images[start:stop], _WORKER["kernels"][index], **_WORKER["options"])
+
+def convolve_batch(stack, kernels, mode="same", method="auto", tol=0, workers=None):
+    r"""Convolves every image of a stack with every kernel in a pool of
+    processes. The stack and the responses live in shared memory blocks
+    that the workers attach to without copy, and the kernels are sent once
+    per worker, so that tasks only carry indices.
+
+    :param stack: Images of shape (N, H, W)
+    :type stack: np.ndarray
+    :param kernels: The K kernels to apply
+    :type kernels: list
+    :param mode: Output size, all kernels must have the same shape unless "same", defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    :param method: Convolution algorithm, defaults to "auto"
+    :type method: "auto"|"direct"|"separable"|"fft"
+    :param tol: Error budget of the separable method, defaults to 0
+    :type tol: float
+    :param workers: Number of processes, defaults to the number of cores
+    :type workers: int|None
+    :return: the responses of shape (N, K, H', W')
+    :rtype: np.ndarray
+    """
+    stack, kernels = np.asarray(stack), [_as_kernel(k) for k in kernels]
+    if stack.ndim != 3:
+        raise ValueError("Stack must have exactly three axes (N, H, W)")
+    if len({k.shape for k in kernels}) > 1 and mode != "same":
+        raise ValueError("Kernels must have the same shape unless mode is 'same'")
+    workers = workers or os.cpu_count()
+    shape = (stack.shape[0], len(kernels)) + _window(mode, stack.shape, kernels[0].shape)[1]
+    dtype = np.result_type(*(_result_dtype(stack, k) for k in kernels))
+
+    blocks = [SharedMemory(create=True, size=max(1, n)) for n in (stack.nbytes, int(np.prod(shape)) * dtype.itemsize)]
+    try:
+        np.ndarray(stack.shape, stack.dtype, buffer=blocks[0].buf)[...] = stack
+        # About four tasks per worker, of a single kernel each
+        chunk = max(1, min(stack.shape[0], -(-stack.shape[0] * len(kernels) // (4 * workers))))
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(
+            (blocks[0].name, stack.shape, stack.dtype), (blocks[1].name, shape, dtype),
+            kernels, {"mode" : mode, "method" : method, "tol" : tol}
+        )) as pool:
+            for future in [
+                pool.submit(_run, index, start, min(start + chunk, stack.shape[0]))
+                for index in range(len(kernels)) for start in range(0, stack.shape[0], chunk)
+            ]:
+                future.result()
+        return np.ndarray(shape, dtype, buffer=blocks[1].buf).copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,540 @@
+"""Apply kernels to images"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+import numpy as np
+
+from .objs.Kernel import Kernel
+from .objs.LRUCache import LRUCache
+
+MODES = ("full", "same", "valid")
+METHODS = ("auto", "direct", "separable", "fft", "winograd", "box")
+OUTPUTS = ("raw", "magnitude", "orientation")
+
+# Relative costs of one multiply-add of a shifted-slice accumulation, of
+# one addition of a unit tap, of one n*log2(n) unit of a real FFT
+# convolution and of one output pixel of the Winograd transforms and of
+# the running sums of a box kernel, see benchmarks/convolution.py
+DIRECT_COST = 1.0
+UNIT_COST = 0.5
+FFT_COST = 1.6
+WINOGRAD_COST = 6.0
+BOX_COST = 8.0
+
+PLAN_CACHE = LRUCache(max_bytes=2**28)
+r"""Cache of the FFT plans, bounded to 256 MiB of kernel spectra by default"""
+
+BAND_BYTES = 2**24
+r"""Size of the response of the row bands reduced one by one to their magnitude or orientation"""
+
+_POOL, _POOL_LOCK = None, Lock()
+
+
+def _as_kernel(kernel):
+    return kernel if isinstance(kernel, Kernel) else Kernel(np.asarray(kernel))
+
+def _window(mode, image_shape, kernel_shape):
+    r"""Returns the (row, col) offsets and the shape of the output of a
+    convolution inside the full convolution output.
+    """
+    (img_h, img_w), (ker_h, ker_w) = image_shape[-2:], kernel_shape
+    if mode == "full":
+        return (0, 0), (img_h + ker_h - 1, img_w + ker_w - 1)
+    if mode == "same":
+        return ((ker_h - 1)//2, (ker_w - 1)//2), (img_h, img_w)
+    if mode == "valid":
+        if img_h < ker_h or img_w < ker_w:
+            raise ValueError("Kernel must fit inside the image in 'valid' mode")
+        return (ker_h - 1, ker_w - 1), (img_h - ker_h + 1, img_w - ker_w + 1)
+    raise ValueError(f"Mode must be in {list(MODES)}")
+
+def _result_dtype(image, kernel):
+    return np.result_type(image.dtype, kernel.dtype, np.float32)
+
+def _output_dtype(dtype, output):
+    return dtype if output == "raw" else np.finfo(dtype).dtype
+
+def _reduce(response, output):
+    r"""Reduces a response, x + iy for a complex kernel, to the requested output."""
+    if output == "magnitude":
+        return np.abs(response)
+    if output == "orientation":
+        return np.arctan2(response.imag, response.real)
+    return response
+
+def _full_spectrum(half, shape):
+    r"""Rebuilds the full 2D spectrum of a real image from its rfft2."""
+    height, width = shape
+    full = np.empty(half.shape[:-1] + (width,), half.dtype)
+    full[..., :half.shape[-1]] = half
+    mirrored = half[..., (-np.arange(height)) % height, 1:width - half.shape[-1] + 1]
+    full[..., half.shape[-1]:] = np.conj(mirrored[..., ::-1])
+    return full
+
+def next_fast_len(target):
+    r"""Returns the smallest 5-smooth integer (only 2, 3 and 5 as prime
+    factors) greater or equal to target, which are the fastest FFT lengths.
+
+    :param target: Minimal length
+    :type target: int
+    :return: a 5-smooth length
+    :rtype: int
+    """
+    best = 2**int(np.ceil(np.log2(max(target, 1))))
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35 * 2**int(np.ceil(np.log2(-(-target // power35))))
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+def cost(image_shape, kernel, mode="same", tol=0):
+    r"""Estimates the cost of every convolution method, the lowest being
+    the one selected by the "auto" method.
+
+    :param image_shape: Shape of the image, the two last axes are convolved
+    :type image_shape: tuple
+    :param kernel: The kernel to apply
+    :type kernel: Kernel|np.ndarray
+    :param mode: Output size, defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    :param tol: Error budget of the separable method, see :meth:`Kernel.low_rank`
+    :type tol: float
+    :return: a dict mapping each available method to its estimated cost
+    :rtype: dict
+    """
+    kernel = _as_kernel(kernel)
+    _, (out_h, out_w) = _window(mode, image_shape, kernel.shape)
+    batch = int(np.prod(image_shape[:-2]))
+    complex_kernel = np.issubdtype(kernel.dtype, np.complexfloating)
+    weights = kernel._taps()[2] # pylint: disable=protected-access
+    parts = (weights.real, weights.imag) if complex_kernel else (weights,)
+    taps = sum(np.count_nonzero(part) for part in parts)
+    units = sum(np.count_nonzero(np.abs(part) == 1) for part in parts)
+    costs = {"direct" : (DIRECT_COST * (taps - units) + UNIT_COST * units) * out_h * out_w}
+    if min(kernel.shape) > 1:
+        rank = len(kernel.low_rank(tol))
+        costs["separable"] = DIRECT_COST * rank * (kernel.shape[0] * image_shape[-1] + kernel.shape[1] * out_w) * out_h
+    if kernel._box() is not None: # pylint: disable=protected-access
+        costs["box"] = BOX_COST * out_h * out_w
+    if kernel.shape == (3, 3):
+        costs["winograd"] = WINOGRAD_COST * (1.1 if complex_kernel else 1) * out_h * out_w
+    fft_shape = [next_fast_len(n + k - 1) for n, k in zip(image_shape[-2:], kernel.shape)]
+    fft_size = np.prod(fft_shape)
+    costs["fft"] = FFT_COST * fft_size * np.log2(fft_size) * (1.5 if complex_kernel else 1)
+    return {method : batch * value for method, value in costs.items()}
+
+def _direct(image, kernel, mode):
+    r"""Sums the shifted views of the image weighted by the non-zero taps of
+    the kernel, strided kernels only iterating over their original
+    coefficients.
+    """
+    (row, col), (out_h, out_w) = _window(mode, image.shape, kernel.shape)
+    top, left = kernel.shape[0] - 1 - row, kernel.shape[1] - 1 - col
+    bot = max(0, row + out_h - image.shape[-2])
+    right = max(0, col + out_w - image.shape[-1])
+    pad = [(0, 0)] * (image.ndim - 2) + [(max(0, top), bot), (max(0, left), right)]
+    padded = np.pad(image, pad) if any(p != (0, 0) for p in pad) else image
+    row, col = row + max(0, top), col + max(0, left)
+
+    shape, dtype = image.shape[:-2] + (out_h, out_w), _result_dtype(image, kernel)
+    rows, cols, weights = kernel._taps() # pylint: disable=protected-access
+    # A real image and a complex kernel accumulate the real and imaginary parts
+    # in real buffers, skipping the zero parts of the coefficients
+    split = np.iscomplexobj(weights) and not np.iscomplexobj(image)
+    parts = (weights.real, weights.imag) if split else (weights,)
+    sums = [np.zeros(shape, np.finfo(dtype).dtype if split else dtype) for _ in parts]
+    tmp = np.empty_like(sums[0])
+    for tap, (i, j) in enumerate(zip(rows, cols)):
+        view = padded[..., row - i:row - i + out_h, col - j:col - j + out_w]
+        for total, part in zip(sums, parts):
+            # Unit taps, like the ones of the shapes, are plain sums of views
+            if part[tap] == 1:
+                total += view
+            elif part[tap] == -1:
+                total -= view
+            elif part[tap]:
+                np.multiply(view, part[tap], out=tmp)
+                total += tmp
+    if not split:
+        return sums[0]
+    out = np.empty(shape, dtype)
+    out.real, out.imag = sums
+    return out
+
+# Winograd F(2x2, 3x3) transforms: B^T of the input tiles, G of the kernel
+# and A^T of the output tiles
+WINOGRAD_B = np.array([[1, 0, -1, 0], [0, 1, 1, 0], [0, -1, 1, 0], [0, 1, 0, -1]])
+WINOGRAD_G = np.array([[1, 0, 0], [.5, .5, .5], [.5, -.5, .5], [0, 0, 1]])
+WINOGRAD_A = np.array([[1, 1, 1, 0], [0, 1, -1, -1]])
+
+def _combine(coefficients, arrays):
+    r"""Returns the linear combination of arrays, skipping zero coefficients and None arrays."""
+    out = None
+    for coefficient, array in zip(coefficients, arrays):
+        if coefficient == 0 or array is None:
+            continue
+        # Python scalars keep the precision of the arrays
+        coefficient = coefficient.item() if isinstance(coefficient, np.generic) else coefficient
+        if out is None:
+            out = array * coefficient
+        elif coefficient == 1:
+            out += array
+        elif coefficient == -1:
+            out -= array
+        else:
+            out += array * coefficient
+    return out
+
+def _winograd(image, ker, mode, block_bytes=2**22):
+    r"""Winograd F(2x2, 3x3) convolution: the image is cut in 4x4 tiles with a
+    stride of 2, each tile is transformed with B, multiplied elementwise with
+    the transformed kernel and transformed back with A into a 2x2 output tile.
+    It uses 16 multiplications per 2x2 outputs instead of 36. Tiles are
+    processed by bands of rows so that the transformed tiles stay in cache.
+    """
+    (row, col), (out_h, out_w) = _window(mode, image.shape, ker.shape)
+    tiles_h, tiles_w = -(-out_h // 2), -(-out_w // 2)
+    dtype = _result_dtype(image, ker)
+    # A real image and a complex kernel share the input transform of the
+    # real and imaginary parts
+    split = np.iscomplexobj(ker) and not np.iscomplexobj(image)
+    work = np.finfo(dtype).dtype if split else dtype
+    # Correlation with the flipped kernel
+    spectra = [
+        (WINOGRAD_G @ weights[::-1, ::-1] @ WINOGRAD_G.T).astype(work)
+        for weights in ((ker.real, ker.imag) if split else (ker,))
+    ]
+    out = np.empty(image.shape[:-2] + (2*tiles_h, 2*tiles_w), dtype)
+    band = max(1, block_bytes // (32 * tiles_w * work.itemsize * max(1, int(np.prod(image.shape[:-2])))))
+    buffer = np.empty(image.shape[:-2] + (2*band + 2, 2*tiles_w + 2), work)
+
+    for first in range(0, tiles_h, band):
+        count = min(band, tiles_h - first)
+        tile = _read_halo(image, slice(row - 2 + 2*first, row + 2*(first + count)), slice(col - 2, col + 2*tiles_w), buffer)
+        rows = [_combine(b, [tile[..., u:u + 2*count:2, :] for u in range(4)]) for b in WINOGRAD_B]
+        transformed = [[_combine(b, [r[..., v:v + 2*tiles_w:2] for v in range(4)]) for b in WINOGRAD_B] for r in rows]
+        block = out[..., 2*first:2*(first + count), :]
+        for part, spectrum in zip((block.real, block.imag) if split else (block,), spectra):
+            products = [[
+                transformed[p][q] * spectrum[p, q] if spectrum[p, q] else None for q in range(4)
+            ] for p in range(4)]
+            for i, a_row in enumerate(WINOGRAD_A):
+                partial = [_combine(a_row, [products[p][q] for p in range(4)]) for q in range(4)]
+                for j, a_col in enumerate(WINOGRAD_A):
+                    value = _combine(a_col, partial)
+                    part[..., i::2, j::2] = 0 if value is None else value
+    return out[..., :out_h, :out_w]
+
+def _box(image, kernel, mode):
+    r"""Convolution with a kernel constant on a rectangle, whatever its size:
+    each output is the difference of two cumulative sums along the rows,
+    then along the columns.
+    """
+    (row, col), (out_h, out_w) = _window(mode, image.shape, kernel.shape)
+    (top, left, bot, right), value = kernel._box() # pylint: disable=protected-access
+    # Integer sums wrap around on overflow but their differences are exact,
+    # floats are summed in double precision
+    if np.issubdtype(image.dtype, np.unsignedinteger):
+        accumulator = np.uint64
+    elif np.issubdtype(image.dtype, np.integer) or image.dtype == bool:
+        accumulator = np.int64
+    else:
+        accumulator = np.result_type(image.dtype, np.float64)
+    out = image
+    for axis, first, size, (low, high) in ((-2, row, out_h, (top, bot)), (-1, col, out_w, (left, right))):
+        length = out.shape[axis]
+        sums = np.zeros(out.shape[:axis] + (length + 1,) + out.shape[axis:][1:], accumulator)
+        np.cumsum(out, axis=axis, dtype=accumulator, out=np.moveaxis(np.moveaxis(sums, axis, 0)[1:], 0, axis))
+        positions = np.arange(first, first + size)
+        out = np.take(sums, np.clip(positions - low + 1, 0, length), axis) - np.take(sums, np.clip(positions - high, 0, length), axis)
+    return (out * value).astype(_result_dtype(image, kernel), copy=False)
+
+def _separable(image, kernel, mode, terms):
+    dtype = _result_dtype(image, kernel)
+    out = None
+    for column, row in terms:
+        part = _direct(image, Kernel(column[:, None].astype(dtype)), mode)
+        part = _direct(part, Kernel(row[None, :].astype(dtype)), mode)
+        out = part if out is None else np.add(out, part, out=out)
+    return out if out is not None else _direct(image, Kernel(np.zeros(kernel.shape, dtype)), mode)
+
+class FFTPlan:
+    r"""FFT convolution of a kernel with images of a given shape, the
+    spectrum of the kernel being computed once, zero-padded to 5-smooth
+    lengths. Use :func:`plan` to get cached plans. A kernel with leading axes
+    is a bank of kernels, the image spectrum is then computed once and
+    multiplied with every kernel spectrum.
+
+    :param kernel: The kernel to apply, or a (K, kh, kw) bank of kernels
+    :type kernel: Kernel|np.ndarray
+    :param image_shape: Shape of the images, only the two last axes are used
+    :type image_shape: tuple
+    :param dtype: Data type of the images, defaults to np.float64
+    :type dtype: np.dtype
+    :param mode: Output size, defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    """
+    def __init__(self, kernel, image_shape, dtype=np.float64, mode="same"):
+        ker = _as_kernel(kernel).numpy
+        self.image_shape, self.mode = tuple(image_shape[-2:]), mode
+        self.dtype = np.result_type(dtype, ker.dtype, np.float32)
+        self._offset, self.output_shape = _window(mode, self.image_shape, ker.shape[-2:])
+        self.fft_shape = tuple(next_fast_len(n + k - 1) for n, k in zip(self.image_shape, ker.shape[-2:]))
+        self._complex = np.issubdtype(self.dtype, np.complexfloating)
+        transform = np.fft.fft2 if self._complex else np.fft.rfft2
+        self.spectrum = transform(ker.astype(self.dtype, copy=False), self.fft_shape)
+
+    @property
+    def nbytes(self):
+        r"""Size of the kernel spectrum in bytes"""
+        return self.spectrum.nbytes
+
+    def _execute(self, images):
+        if images.shape[-2:] != self.image_shape:
+            raise ValueError(f"Plan was made for images of shape {self.image_shape}")
+        bank = (..., *(None,) * (self.spectrum.ndim - 2), slice(None), slice(None))
+        if self._complex and not np.iscomplexobj(images):
+            # Real image and complex kernel: x + iy in a single complex inverse FFT
+            images = images.astype(np.finfo(self.dtype).dtype, copy=False)
+            spectrum = _full_spectrum(np.fft.rfft2(images, self.fft_shape), self.fft_shape)
+            full = np.fft.ifft2(spectrum[bank] * self.spectrum)
+        elif self._complex:
+            images = images.astype(self.dtype, copy=False)
+            full = np.fft.ifft2(np.fft.fft2(images, self.fft_shape)[bank] * self.spectrum)
+        else:
+            images = images.astype(self.dtype, copy=False)
+            full = np.fft.irfft2(np.fft.rfft2(images, self.fft_shape)[bank] * self.spectrum, self.fft_shape)
+        (row, col), (out_h, out_w) = self._offset, self.output_shape
+        return full[..., row:row + out_h, col:col + out_w].astype(self.dtype, copy=False)
+
+    def execute(self, image):
+        r"""Convolves an image
+
+        :param image: Image of the planned shape
+        :type image: np.ndarray
+        :return: the convolved image, of shape (K, H', W') for a bank
+        :rtype: np.ndarray
+        """
+        image = np.asarray(image)
+        if image.ndim != 2:
+            raise ValueError("Image must have two axes, use execute_batch for stacks")
+        return self._execute(image)
+
+    def execute_batch(self, stack):
+        r"""Convolves a stack of images in one batched FFT
+
+        :param stack: Images of the planned shape stacked along the leading axes
+        :type stack: np.ndarray
+        :return: the convolved images
+        :rtype: np.ndarray
+        """
+        stack = np.asarray(stack)
+        if stack.ndim < 3:
+            raise ValueError("Stack must have at least three axes")
+        return self._execute(stack)
+
+def plan(kernel, image_shape, dtype=np.float64, mode="same"):
+    r"""Returns the FFT plan of a kernel for images of a given shape and dtype
+    from :data:`PLAN_CACHE`, keyed on the kernel content, the shape, the dtype
+    and the mode.
+
+    :param kernel: The kernel to apply
+    :type kernel: Kernel|np.ndarray
+    :param image_shape: Shape of the images, only the two last axes are used
+    :type image_shape: tuple
+    :param dtype: Data type of the images, defaults to np.float64
+    :type dtype: np.dtype
+    :param mode: Output size, defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    :return: a FFTPlan object
+    :rtype: FFTPlan
+    """
+    kernel = _as_kernel(kernel)
+    key = (kernel._digest(), tuple(image_shape[-2:]), np.dtype(dtype).str, mode) # pylint: disable=protected-access
+    return PLAN_CACHE.get(key, lambda : FFTPlan(kernel, image_shape, dtype, mode), lambda p: p.nbytes)
+
+def convolve(image, kernel, mode="same", method="auto", tol=0, workers=None, output="raw"):
+    r"""Convolves the two last axes of an image with a kernel, with zero
+    boundaries. The "auto" method picks the cheapest of the direct
+    sliding-window, the separable two-pass, the FFT, for 3x3 kernels the
+    Winograd F(2x2, 3x3) and, for kernels constant on a rectangle like
+    :func:`kerpy.processing.mean`, the running sums "box" methods according
+    to :func:`cost`. The separable method sums the two-pass convolutions of the
+    cached :meth:`Kernel.low_rank` terms of the kernel. The box method sums
+    integer images in 64 bits integers, without overflow.
+
+    Complex kernels, like the ones of :mod:`kerpy.diff`, are applied in a
+    single pass giving the complex response x + iy, which can be reduced to
+    its magnitude or orientation band by band, the response of a band of
+    about :data:`BAND_BYTES` being the only intermediate array.
+
+    :param image: Image to convolve, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: The kernel to apply
+    :type kernel: Kernel|np.ndarray
+    :param mode: Output size, like numpy.convolve, defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    :param method: Convolution algorithm, defaults to "auto"
+    :type method: "auto"|"direct"|"separable"|"fft"|"winograd"|"box"
+    :param tol: Error budget of the separable method, see :meth:`Kernel.low_rank`, defaults to 0
+    :type tol: float
+    :param workers: Number of threads convolving row bands of the image, with
+        the halo of the kernel, into a shared output, defaults to None
+    :type workers: int|None
+    :param output: Returns the response, its absolute value, or its angle in
+        radians, defaults to "raw"
+    :type output: "raw"|"magnitude"|"orientation"
+    :raises ValueError: unknown mode, method or output, Winograd method on a non 3x3 kernel,
+        box method on a kernel not constant on a rectangle
+    :return: the convolved image
+    :rtype: np.ndarray
+    """
+    image, kernel = np.asarray(image), _as_kernel(kernel)
+    if image.ndim < 2 or len(kernel.shape) != 2:
+        raise ValueError("Image must have at least two axes and the kernel exactly two")
+    if method not in METHODS:
+        raise ValueError(f"Method must be in {list(METHODS)}")
+    if output not in OUTPUTS:
+        raise ValueError(f"Output must be in {list(OUTPUTS)}")
+    if method == "auto":
+        costs = cost(image.shape, kernel, mode, tol)
+        method = min(costs, key=costs.get)
+    offset, (out_h, out_w) = _window(mode, image.shape, kernel.shape)
+    dtype, bands = _result_dtype(image, kernel), None
+    if workers is not None and workers > 1:
+        bands = np.linspace(0, out_h, min(workers, out_h) + 1).astype(int)
+    elif output != "raw":
+        # Bands of about BAND_BYTES of response, reduced one after the other
+        rows = max(1, BAND_BYTES // (int(np.prod(image.shape[:-2], dtype=np.int64)) * out_w * dtype.itemsize))
+        bands = np.append(np.arange(0, out_h, rows), out_h) if rows < out_h else None
+    if bands is not None:
+        out = np.empty(image.shape[:-2] + (out_h, out_w), _output_dtype(dtype, output))
+        _map(_convolve_tile, [
+            (image, kernel, out, slice(top, bot), slice(0, out_w), offset, method, tol, output)
+            for top, bot in zip(bands[:-1], bands[1:])
+        ], workers)
+        return out
+    if method == "direct":
+        return _reduce(_direct(image, kernel, mode), output)
+    if method == "separable":
+        return _reduce(_separable(image, kernel, mode, kernel.low_rank(tol)), output)
+    if method == "box":
+        if kernel._box() is None: # pylint: disable=protected-access
+            raise ValueError("Box method is only available for kernels constant on a rectangle")
+        return _reduce(_box(image, kernel, mode), output)
+    if method == "winograd":
+        if kernel.shape != (3, 3):
+            raise ValueError("Winograd method is only available for 3x3 kernels")
+        return _reduce(_winograd(image, kernel.numpy, mode), output)
+    fft_plan = plan(kernel, image.shape, image.dtype, mode)
+    return _reduce(fft_plan.execute(image) if image.ndim == 2 else fft_plan.execute_batch(image), output)
+
+def _pool(workers):
+    r"""Returns the persistent thread pool, grown to at least workers threads.
+    A replaced pool is not shut down, as other calls may still be submitting
+    to it, its threads exiting once it is garbage collected.
+    """
+    global _POOL # pylint: disable=global-statement
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._max_workers < workers: # pylint: disable=protected-access
+            _POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kerpy")
+        return _POOL
+
+def _map(function, tasks, workers):
+    r"""Calls function on every task, in the thread pool if workers > 1, with
+    at most workers tasks running at once for this call.
+    """
+    if workers is None or workers <= 1:
+        for task in tasks:
+            function(*task)
+        return
+    pool, pending = _pool(workers), set()
+    for task in tasks:
+        if len(pending) >= workers:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        pending.add(pool.submit(function, *task))
+    for future in pending:
+        future.result()
+
+def _read_halo(image, rows, cols, out=None):
+    r"""Reads image[..., rows, cols] into memory, or into out, out of bounds coefficients being zeros."""
+    shape = image.shape[:-2] + (rows.stop - rows.start, cols.stop - cols.start)
+    tile = np.zeros(shape, dtype=image.dtype) if out is None else out[..., :shape[-2], :shape[-1]]
+    if out is not None:
+        tile[...] = 0
+    top, left = max(rows.start, 0), max(cols.start, 0)
+    bot, right = min(rows.stop, image.shape[-2]), min(cols.stop, image.shape[-1])
+    if top < bot and left < right:
+        tile[..., top - rows.start:bot - rows.start, left - cols.start:right - cols.start] = image[..., top:bot, left:right]
+    return tile
+
+def _convolve_tile(image, kernel, out, rows, cols, offset, method, tol, output):
+    r"""Overlap-save convolution of the image with its halo into out[rows, cols]."""
+    (row, col), (ker_h, ker_w) = offset, kernel.shape
+    tile = _read_halo(
+        image,
+        slice(rows.start + row - ker_h + 1, rows.stop + row),
+        slice(cols.start + col - ker_w + 1, cols.stop + col)
+    )
+    out[..., rows, cols] = convolve(tile, kernel, "valid", method, tol, output=output)
+
+def convolve_tiled(image, kernel, out=None, mode="same", method="auto", tol=0, tile_bytes=2**26, workers=None,
+    output="raw"):
+    r"""Convolves a 2D image tile by tile with overlap-save: each tile is read
+    with the halo of the kernel, convolved in "valid" mode and written into
+    the output, so that the peak memory is bounded by tile_bytes instead of
+    the image size. Images and outputs can be .npy files, which are memory
+    mapped.
+
+    :param image: Image, or path of a .npy file opened with mmap_mode="r"
+    :type image: np.ndarray|str
+    :param kernel: The kernel to apply
+    :type kernel: Kernel|np.ndarray
+    :param out: Output array, or path of a .npy file to create, defaults to a new array
+    :type out: np.ndarray|str|None
+    :param mode: Output size, defaults to "same"
+    :type mode: "full"|"same"|"valid"
+    :param method: Convolution algorithm of the tiles, defaults to "auto"
+    :type method: "auto"|"direct"|"separable"|"fft"
+    :param tol: Error budget of the separable method, defaults to 0
+    :type tol: float
+    :param tile_bytes: Memory budget of the working buffers of one tile, defaults to 64 MiB
+    :type tile_bytes: int
+    :param workers: Number of tiles convolved in parallel threads, each one
+        with its own tile budget, defaults to None
+    :type workers: int|None
+    :param output: Returns the response, its absolute value, or its angle in
+        radians, defaults to "raw"
+    :type output: "raw"|"magnitude"|"orientation"
+    :return: the convolved image
+    :rtype: np.ndarray|np.memmap
+    """
+    image = np.load(image, mmap_mode="r") if isinstance(image, str) else image
+    kernel = _as_kernel(kernel)
+    if image.ndim != 2 or len(kernel.shape) != 2:
+        raise ValueError("Image and kernel must have exactly two axes")
+    offset, out_shape = _window(mode, image.shape, kernel.shape)
+    dtype = _output_dtype(_result_dtype(image, kernel), output)
+    if out is None:
+        out = np.empty(out_shape, dtype)
+    elif isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=out_shape)
+    if out.shape != out_shape:
+        raise ValueError(f"Output must be of shape {out_shape}")
+
+    # Input tile, image and kernel spectra, product and full output of the FFT
+    pixels = tile_bytes // (6 * dtype.itemsize)
+    side = max(1, int(np.sqrt(pixels)) - max(kernel.shape) + 1)
+    _map(_convolve_tile, [
+        (image, kernel, out, slice(top, min(top + side, out_shape[0])), slice(left, min(left + side, out_shape[1])),
+        offset, method, tol, output)
+        for top in range(0, out_shape[0], side) for left in range(0, out_shape[1], side)
+    ], workers)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
@@ -43,6 +43,7 @@ def prewitt(orient_x : bool =0, orient_y : bool=0, size : tuple[int, int]=(3,3))
 
     return ker
 
+@Kernel.decorator
 def sobel(orient_x : bool =0, orient_y : bool=0, size : tuple[int, int]=(3,3)) -> Kernel:
     r"""Returns a complex kernel corresponding to the Sobel operator, 
     which is Prewitt plus the finite central.
@@ -175,6 +176,7 @@ def finite(orient_x : bool = 0, orient_y : bool= 0, flip: bool=True) -> Kernel:
     return ker
 
 
+@Kernel.decorator
 def laplacian(mode="diamond") -> Kernel:
     r"""Return a real kernel corresponding to the Laplacian kernel. 
     Interesting to compute an image Laplacian.
@@ -198,5 +200,6 @@ def laplacian(mode="diamond") -> Kernel:
     elif mode == "square":
         ker = shapes.square(size=(3,3),scale=(1,1))
     else : raise ValueError("Mode must be in ['square', 'diamond']")
-    ker.numpy[1,1] = -np.sum(ker.numpy) +1
-    return ker * -1
+    center = np.zeros(ker.shape, dtype=ker.dtype)
+    center[1,1] = np.sum(ker.numpy)
+    return (ker - center) * -1
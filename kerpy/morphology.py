@@ -0,0 +1,708 @@
+"""Flat grayscale and binary morphology with the kernels of kerpy.shapes"""
+# pylint: disable=redefined-builtin
+import numpy as np
+
+from .convolution import _as_kernel
+from .objs.Kernel import Kernel
+
+METHODS = ("auto", "direct", "van_herk", "decompose", "bits", "lut")
+
+# Relative costs of one shifted-slice min/max of a tap, of one van
+# Herk/Gil-Werman pass along an axis, of one AND/OR of a tap and one bit
+# shift of a column of taps on the packed words of a boolean image, and
+# of its packing and unpacking, and of one 3x3 table lookup, see
+# benchmarks/morphology.py
+DIRECT_COST = 1.0
+VAN_HERK_COST = 16.0
+BITS_COST = 0.1
+SHIFT_COST = 0.35
+PACK_COST = 4.0
+LUT_COST = 48.0
+
+# Little-endian 64 bits words of the packed boolean images
+WORD = np.dtype("<u8")
+
+# Hit and miss 3x3 structuring elements of the thinning, the rotations by
+# 90 degrees of the two Golay L elements
+THINNING = [
+    (np.rot90(hit, turn), np.rot90(miss, turn)) for turn in range(4) for hit, miss in (
+        (np.array([[0, 0, 0], [0, 1, 0], [1, 1, 1]]), np.array([[1, 1, 1], [0, 0, 0], [0, 0, 0]])),
+        (np.array([[0, 0, 0], [1, 1, 0], [0, 1, 0]]), np.array([[0, 1, 1], [0, 0, 1], [0, 0, 0]])),
+    )
+]
+
+# Directions of the periodic lines approximating the convex shapes
+LINE_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1), (1, 2), (2, 1), (1, -2), (2, -1))
+
+def _limits(dtype):
+    r"""Returns the smallest and largest values of a dtype, the neutral
+    elements of the max and of the min.
+    """
+    if dtype == np.bool_:
+        return False, True
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).min, np.iinfo(dtype).max
+    return -np.inf, np.inf
+
+def cost(kernel, tol=0, dtype=np.float64):
+    r"""Relative costs per pixel of the morphology methods for a structuring
+    element. The van Herk/Gil-Werman method is only available for the
+    rectangles and the horizontal or vertical lines, the decompose method
+    for the structuring elements of :func:`decompose` with more than one
+    factor, the bits method for the boolean images and the lut method for
+    the boolean images and the 3x3 structuring elements.
+
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param tol: Error budget of the decomposition, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :param dtype: Data type of the images, defaults to np.float64
+    :type dtype: np.dtype
+    :return: the cost of each available method
+    :rtype: dict
+    """
+    kernel = _as_kernel(kernel)
+    costs = _costs(kernel, dtype)
+    terms, _ = kernel.decompose_morphological(tol)
+    if len(terms) > 1 or len(terms[0]) > 1:
+        costs["decompose"] = _decomposed_cost(terms, dtype)
+    return costs
+
+def _costs(kernel, dtype=np.float64):
+    rows, cols, _ = kernel._taps() # pylint: disable=protected-access
+    costs = {"direct": DIRECT_COST * rows.size}
+    if np.dtype(dtype) == np.bool_:
+        costs["bits"] = BITS_COST * rows.size + SHIFT_COST * np.unique(cols).size + PACK_COST
+        if kernel.shape == (3, 3):
+            costs["lut"] = LUT_COST
+    bounds = _rectangle(kernel)
+    if bounds is not None:
+        top, left, bot, right = bounds
+        costs["van_herk"] = VAN_HERK_COST * ((bot > top) + (right > left))
+    return costs
+
+def _decomposed_cost(terms, dtype=np.float64):
+    r"""Cost of the factors, of the padding and cropping of the image and of
+    the combination of the terms.
+    """
+    factors = sum(min(_costs(factor, dtype).values()) for term in terms for factor in term)
+    return factors + DIRECT_COST * (len(terms) + 2)
+
+def _rectangle(kernel):
+    r"""Returns the (top, left, bot, right) bounds of a structuring element
+    filling a rectangle, else None.
+    """
+    rows, cols, _ = kernel._taps() # pylint: disable=protected-access
+    if not rows.size:
+        return None
+    top, left, bot, right = rows.min(), cols.min(), rows.max(), cols.max()
+    if np.unique(rows * kernel.shape[1] + cols).size != (bot - top + 1) * (right - left + 1):
+        return None
+    return int(top), int(left), int(bot), int(right)
+
+def _offsets(kernel, reflect):
+    r"""Returns the row and column offsets of the taps of a structuring
+    element relative to its center, reflected for the dilation.
+    """
+    rows, cols, _ = kernel._taps() # pylint: disable=protected-access
+    rows, cols = rows - (kernel.shape[0] - 1) // 2, cols - (kernel.shape[1] - 1) // 2
+    return (-rows, -cols) if reflect else (rows, cols)
+
+def _support(kernel):
+    r"""Returns the (row, column) offsets of the taps of a structuring element
+    relative to its center.
+    """
+    return np.stack(_offsets(kernel, False), axis=-1)
+
+def _minkowski(first, second):
+    return np.unique((first[:, None] + second[None]).reshape(-1, 2), axis=0)
+
+def _mismatch(offsets, target):
+    r"""Returns the number of offsets in only one of the two sets."""
+    encode = lambda points: points[:, 0] * 2**32 + points[:, 1]
+    return np.setxor1d(encode(offsets), encode(target)).size
+
+def _element(offsets):
+    r"""Returns the smallest centered structuring element with the offsets."""
+    radius = np.abs(offsets).max(axis=0)
+    ker = np.zeros(2 * radius + 1, np.int64)
+    ker[tuple((offsets + radius).T)] = 1
+    return Kernel(ker)
+
+def _center(target):
+    r"""Returns the center of the bounding box of the offsets, None if it is
+    not on the grid.
+    """
+    low, high = target.min(axis=0), target.max(axis=0)
+    return None if np.any((low + high) % 2) else (low + high) // 2
+
+def _rectangles(target):
+    r"""Exact decomposition as the union of rectangles, the Minkowski sums of
+    a horizontal and a vertical line: each run of a row gives the rectangle
+    of the following and preceding rows holding it, those contained in
+    another rectangle being dropped.
+    """
+    runs = {}
+    for row in np.unique(target[:, 0]):
+        cols = np.sort(target[target[:, 0] == row, 1])
+        starts = np.flatnonzero(np.diff(cols, prepend=cols[0] - 2) > 1)
+        ends = np.append(starts[1:], cols.size) - 1
+        runs[int(row)] = [(int(cols[start]), int(cols[end])) for start, end in zip(starts, ends)]
+    rectangles = set()
+    for left, right in {run for row_runs in runs.values() for run in row_runs}:
+        inside = sorted(row for row, row_runs in runs.items() if any(a <= left and right <= b for a, b in row_runs))
+        groups = np.split(np.array(inside), np.flatnonzero(np.diff(inside) > 1) + 1)
+        rectangles.update((int(group[0]), left, int(group[-1]), right) for group in groups)
+    rectangles = [rect for rect in rectangles if not any(
+        other != rect and other[0] <= rect[0] and other[1] <= rect[1] and rect[2] <= other[2] and rect[3] <= other[3]
+        for other in rectangles)]
+    terms = []
+    for top, left, bot, right in sorted(rectangles):
+        # The lines of a single row or column are moved to it, dropping the
+        # single point factors
+        if top == bot or left == right:
+            rows, cols = np.meshgrid(np.arange(top, bot + 1), np.arange(left, right + 1), indexing="ij")
+            terms.append([np.stack([rows.ravel(), cols.ravel()], axis=-1)])
+        else:
+            terms.append([np.stack([np.zeros(right - left + 1, int), np.arange(left, right + 1)], axis=-1),
+                          np.stack([np.arange(top, bot + 1), np.zeros(bot - top + 1, int)], axis=-1)])
+    return terms, 0
+
+def _diamond(target):
+    r"""Exact decomposition of a diamond of radius r as the Minkowski sum of
+    r 3x3 crosses, else None.
+    """
+    center = _center(target)
+    if center is None:
+        return None
+    radius = int(np.abs(target - center).max())
+    cross = np.array([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)])
+    diamond = np.array([(i, j) for i in range(-radius, radius + 1) for j in range(-radius, radius + 1) if abs(i) + abs(j) <= radius])
+    if radius < 2 or _mismatch(diamond + center, target):
+        return None
+    return [[cross + center] + [cross] * (radius - 1)], 0
+
+def _periodic_lines(target):
+    r"""Approximates a convex symmetric shape by the Minkowski sum of periodic
+    lines of :data:`LINE_DIRECTIONS`, grown greedily by one step in the
+    direction reducing the most the number of mismatched offsets.
+    """
+    center = _center(target)
+    if center is None:
+        return None
+    target, current, counts = target - center, np.zeros((1, 2), int), dict.fromkeys(LINE_DIRECTIONS, 0)
+    error = _mismatch(current, target)
+    while True:
+        steps = {direction: _minkowski(current, np.array([direction, (0, 0), (-direction[0], -direction[1])])) for direction in LINE_DIRECTIONS}
+        errors = {direction: _mismatch(grown, target) for direction, grown in steps.items()}
+        best = min(errors, key=errors.get)
+        if errors[best] >= error:
+            break
+        current, error, counts[best] = steps[best], errors[best], counts[best] + 1
+    factors = [np.arange(-count, count + 1)[:, None] * np.array(direction) for direction, count in counts.items() if count]
+    if not factors:
+        return None
+    factors[0] = factors[0] + center
+    return [factors], error
+
+def decompose(kernel, tol=0):
+    r"""Decomposes a structuring element, the non-zero coefficients of a
+    kernel, into small ones: the element is the union of the terms, each
+    term being the Minkowski sum of its factors, so that the erosion or the
+    dilation by the element is the minimum or maximum of the erosions or
+    dilations of each term, each one being a sequence of erosions or
+    dilations by its factors. The cheapest of these decompositions
+    according to :func:`cost` is returned:
+
+    - the union of rectangles, themselves sums of a horizontal and a vertical
+      line, exact for any element and made of a single term for the
+      rectangles like :func:`kerpy.shapes.square`,
+    - the sum of r 3x3 crosses for the diamonds of radius r like
+      :func:`kerpy.shapes.diamond`,
+    - when tol is positive, the sum of periodic lines in the eight
+      directions of :data:`LINE_DIRECTIONS`, which approximates the convex
+      symmetric elements like :func:`kerpy.shapes.circle` with a cost
+      growing linearly with their radius,
+    - the element itself.
+
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param tol: Error budget, the number of offsets in only one of the element
+        and its decomposition relative to the number of offsets of the element, defaults to 0
+    :type tol: float
+    :raises ValueError: empty structuring element
+    :return: the terms, lists of centered structuring elements, and the
+        error of the decomposition
+    :rtype: (list, float)
+    """
+    kernel = _as_kernel(kernel)
+    if not kernel.nnz:
+        raise ValueError("The structuring element must have at least one non-zero coefficient")
+    target = _support(kernel)
+    candidates = [_diamond(target), _rectangles(target), _periodic_lines(target) if tol > 0 else None, ([[target]], 0)]
+    candidates = [
+        ([[_element(factor) for factor in term] for term in terms], mismatch / target.shape[0])
+        for terms, mismatch in filter(None, candidates) if mismatch <= tol * target.shape[0]
+    ]
+    return min(candidates, key=lambda candidate: _decomposed_cost(candidate[0]))
+
+def _direct(image, kernel, op, fill, reflect):
+    r"""Reduces with op the shifted views of the image at the taps of the
+    structuring element, the image being padded once with fill.
+    """
+    rows, cols = _offsets(kernel, reflect)
+    top, left = max(0, -rows.min()), max(0, -cols.min())
+    pad = [(0, 0)] * (image.ndim - 2) + [(top, max(0, rows.max())), (left, max(0, cols.max()))]
+    padded = np.pad(image, pad, constant_values=fill)
+    height, width = image.shape[-2:]
+    out = None
+    for i, j in zip(rows + top, cols + left):
+        view = padded[..., i:i + height, j:j + width]
+        if out is None:
+            out = view.copy()
+        else:
+            op(out, view, out=out)
+    return out
+
+def _van_herk(image, axis, start, length, op, fill):
+    r"""Reduces with op the windows [x + start, x + start + length) along an
+    axis with the van Herk/Gil-Werman algorithm: the padded axis is cut in
+    blocks of the window length, and each window is reduced from the suffix
+    of a block and the prefix of the next one, with three comparisons per
+    pixel whatever the length. The running reductions step through the
+    positions inside the blocks, each step covering all the blocks.
+    """
+    if length == 1 and start == 0:
+        return image
+    axis = axis % image.ndim
+    size = image.shape[axis]
+    blocks = -(-(size + length - 1) // length)
+    shape = image.shape[:axis] + (blocks * length,) + image.shape[axis + 1:]
+    padded = np.full(shape, fill, image.dtype)
+    first, last = max(0, -start), min(blocks * length, size - start)
+    lead = (slice(None),) * axis
+    if first < last:
+        padded[lead + (slice(first, last),)] = image[lead + (slice(first + start, last + start),)]
+    grouped = padded.reshape(image.shape[:axis] + (blocks, length) + image.shape[axis + 1:])
+    suffix = np.empty_like(grouped)
+    at = lambda i: lead + (slice(None), i)
+    suffix[at(length - 1)] = grouped[at(length - 1)]
+    for i in range(length - 2, -1, -1):
+        op(suffix[at(i + 1)], grouped[at(i)], out=suffix[at(i)])
+    for i in range(1, length):
+        op(grouped[at(i - 1)], grouped[at(i)], out=grouped[at(i)])
+    suffix = suffix.reshape(shape)[lead + (slice(0, size),)]
+    return op(suffix, padded[lead + (slice(length - 1, length - 1 + size),)], out=suffix)
+
+def pack(image):
+    r"""Packs the last axis of a boolean image in little-endian 64 bits words,
+    the column x being the bit x % 64 of the word x // 64 and the columns
+    past the width being zeros, that is 64 times less memory than int64.
+
+    :param image: Boolean image, leading axes are batched
+    :type image: np.ndarray
+    :return: the (..., height, ceil(width / 64)) words
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image, bool)
+    packed = np.packbits(image, axis=-1, bitorder="little")
+    words = np.zeros(image.shape[:-1] + (8 * -(-image.shape[-1] // 64),), np.uint8)
+    words[..., :packed.shape[-1]] = packed
+    return words.view(WORD)
+
+def unpack(words, width):
+    r"""Unpacks the words of :func:`pack`.
+
+    :param words: The (..., height, ceil(width / 64)) words
+    :type words: np.ndarray
+    :param width: Width of the image
+    :type width: int
+    :return: the boolean image
+    :rtype: np.ndarray
+    """
+    data = np.ascontiguousarray(words, WORD).view(np.uint8)
+    return np.unpackbits(data, axis=-1, count=width, bitorder="little").view(bool)
+
+def _bits(words, width, kernel, reflect, erosion):
+    r"""Erodes or dilates packed words by ANDing or ORing their shifted views
+    at the taps of the structuring element, 64 pixels at a time: a column
+    shift by 64 q + r reads the word q words away, shifted by r bits, with
+    the bits coming from the next word, once for all the taps of a column.
+    The bits past the width are set to ones for the erosion and cleared in
+    the output.
+    """
+    rows, cols = _offsets(kernel, reflect)
+    height, count = words.shape[-2:]
+    fill = np.uint64(2**64 - 1) if erosion else np.uint64(0)
+    op = np.bitwise_and if erosion else np.bitwise_or
+    tail = np.uint64(2**(width % 64) - 1) if width % 64 else np.uint64(2**64 - 1)
+    top, margin = max(0, -rows.min()), int(np.abs(cols).max()) // 64 + 1
+    padded = np.full(words.shape[:-2] + (height + top + max(0, rows.max()), count + 2 * margin), fill, WORD)
+    padded[..., top:top + height, margin:margin + count] = words
+    if erosion:
+        padded[..., top:top + height, margin + count - 1] |= ~tail
+    out, shifted, high = None, np.empty(padded.shape[:-1] + (count,), WORD), np.empty(padded.shape[:-1] + (count,), WORD)
+    for j in np.unique(cols):
+        shift, bit = divmod(int(j), 64)
+        view = padded[..., margin + shift:margin + shift + count]
+        if bit:
+            np.right_shift(view, np.uint64(bit), out=shifted)
+            np.left_shift(padded[..., margin + shift + 1:margin + shift + 1 + count], np.uint64(64 - bit), out=high)
+            view = np.bitwise_or(shifted, high, out=shifted)
+        # The taps of a column only differ by a row shift, a slice of the
+        # shifted words
+        for i in rows[cols == j] + top:
+            if out is None:
+                out = view[..., i:i + height, :].copy()
+            else:
+                op(out, view[..., i:i + height, :], out=out)
+    out[..., -1] &= tail
+    return out
+
+def _packed(words, kernel, width, reflect, erosion):
+    words, kernel = np.asarray(words), _as_kernel(kernel)
+    if words.ndim < 2 or words.dtype != WORD or words.shape[-1] != -(-width // 64):
+        raise ValueError("Words must be the output of pack for an image of the given width")
+    if not kernel.nnz:
+        raise ValueError("The structuring element must have at least one non-zero coefficient")
+    return _bits(words, width, kernel, reflect, erosion)
+
+def erode_packed(words, kernel, width):
+    r"""Binary erosion of an image packed by :func:`pack`, see :func:`erode`.
+    Each shifted AND of a tap processes 64 pixels per word, the cost being
+    bound by the memory bandwidth.
+
+    :param words: The words of the image, leading axes are batched
+    :type words: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param width: Width of the image
+    :type width: int
+    :raises ValueError: words not packed for the width, empty structuring element
+    :return: the words of the eroded image
+    :rtype: np.ndarray
+    """
+    return _packed(words, kernel, width, False, True)
+
+def dilate_packed(words, kernel, width):
+    r"""Binary dilation of an image packed by :func:`pack`, see :func:`dilate`
+    and :func:`erode_packed`.
+
+    :param words: The words of the image, leading axes are batched
+    :type words: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param width: Width of the image
+    :type width: int
+    :raises ValueError: words not packed for the width, empty structuring element
+    :return: the words of the dilated image
+    :rtype: np.ndarray
+    """
+    return _packed(words, kernel, width, True, False)
+
+def codes(image, border=False):
+    r"""Computes the 9 bits code of the 3x3 neighborhood of every pixel of a
+    boolean image, the bit 3 i + j being the pixel at the row i and column j
+    of the neighborhood, so that the center is the bit 4. The codes of the
+    rows of 3 pixels are computed first, then combined along the columns.
+
+    :param image: Boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param border: Value of the pixels outside the image, defaults to False
+    :type border: bool
+    :return: the uint16 codes
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image, bool)
+    pad = [(0, 0)] * (image.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(image, pad, constant_values=border).astype(np.uint16)
+    rows = padded[..., :-2] | padded[..., 1:-1] << 1 | padded[..., 2:] << 2
+    return rows[..., :-2, :] | rows[..., 1:-1, :] << 3 | rows[..., 2:, :] << 6
+
+def _mask(kernel):
+    r"""Returns the 9 bits code of the non-zero coefficients of a 3x3 kernel."""
+    ker = _as_kernel(kernel)
+    if ker.shape != (3, 3):
+        raise ValueError("Only 3x3 structuring elements have a lookup table")
+    return int(np.sum((ker.numpy != 0).ravel() << np.arange(9)))
+
+def table(hit, miss=None):
+    r"""Returns the 512 entries lookup table of the hit-or-miss transform by a
+    pair of 3x3 structuring elements, true for the codes of :func:`codes`
+    having all the pixels of hit and none of miss. Without miss, this is the
+    table of the erosion by hit.
+
+    :param hit: Structuring element of the foreground pixels
+    :type hit: Kernel|np.ndarray
+    :param miss: Structuring element of the background pixels, defaults to None
+    :type miss: Kernel|np.ndarray|None
+    :raises ValueError: structuring elements which are not 3x3
+    :return: the boolean table
+    :rtype: np.ndarray
+    """
+    entries = np.arange(512)
+    hit = _mask(hit)
+    miss = 0 if miss is None else _mask(miss)
+    return (entries & hit == hit) & (entries & miss == 0)
+
+def lookup(image, lut, border=False):
+    r"""Maps the 3x3 neighborhood of every pixel of a boolean image through a
+    512 entries lookup table indexed by :func:`codes`, like the ones of
+    :func:`table`.
+
+    :param image: Boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param lut: The table
+    :type lut: np.ndarray
+    :param border: Value of the pixels outside the image, defaults to False
+    :type border: bool
+    :raises ValueError: table without 512 entries
+    :return: the image of the table values
+    :rtype: np.ndarray
+    """
+    lut = np.asarray(lut)
+    if lut.shape != (512,):
+        raise ValueError("The lookup table must have 512 entries")
+    return np.take(lut, codes(image, border))
+
+def _lut(image, kernel, reflect, erosion):
+    r"""Erodes or dilates a boolean image by a 3x3 structuring element,
+    reflected or not, through a lookup table of the neighborhood codes.
+    """
+    ker = _as_kernel(kernel).numpy
+    ker = ker[::-1, ::-1] if reflect else ker
+    if erosion:
+        return lookup(image, table(ker), border=True)
+    return lookup(image, np.arange(512) & _mask(ker) != 0)
+
+def hit_or_miss(image, hit, miss):
+    r"""Hit-or-miss transform of a boolean image by a pair of 3x3 structuring
+    elements, centered like :func:`erode`: true for the pixels whose
+    neighborhood has all the pixels of hit and none of miss, the pixels
+    outside the image being background.
+
+    :param image: Boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param hit: Structuring element of the foreground pixels
+    :type hit: Kernel|np.ndarray
+    :param miss: Structuring element of the background pixels
+    :type miss: Kernel|np.ndarray
+    :raises ValueError: structuring elements which are not 3x3
+    :return: the boolean transform
+    :rtype: np.ndarray
+    """
+    return lookup(image, table(hit, miss))
+
+def thin(image, iterations=None):
+    r"""Thinning of a boolean image: each iteration removes in turn the pixels
+    matching the hit-or-miss pairs of :data:`THINNING`, through a lookup
+    table combining the transform with the center pixel, until the image
+    does not change or the number of iterations is reached. The objects are
+    thinned down to their 8-connected skeletons.
+
+    :param image: Boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param iterations: Maximal number of iterations, defaults to None for no limit
+    :type iterations: int|None
+    :return: the thinned image
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image, bool)
+    luts = [(np.arange(512) & 16 != 0) & ~table(hit, miss) for hit, miss in THINNING]
+    count = 0
+    while iterations is None or count < iterations:
+        previous = image
+        for lut in luts:
+            image = lookup(image, lut)
+        count += 1
+        if np.array_equal(image, previous):
+            break
+    return image
+
+def _decomposed(image, terms, reflect, op, fill):
+    r"""Reduces each term of a decomposition, as a sequence of reductions of
+    the image padded with fill by the extent of the terms, and combines the
+    terms with op.
+    """
+    radius = np.max([np.sum([(np.array(factor.shape) - 1) // 2 for factor in term], axis=0) for term in terms], axis=0)
+    pad = [(0, 0)] * (image.ndim - 2) + [(radius[0], radius[0]), (radius[1], radius[1])]
+    padded, out = np.pad(image, pad, constant_values=fill), None
+    for term in terms:
+        reduced = padded
+        for factor in term:
+            costs = _costs(factor, image.dtype)
+            reduced = _apply(reduced, factor, min(costs, key=costs.get), reflect, op, fill)
+        out = reduced if out is None else op(out, reduced, out=out)
+    return np.ascontiguousarray(out[..., radius[0]:radius[0] + image.shape[-2], radius[1]:radius[1] + image.shape[-1]])
+
+def _apply(image, kernel, method, reflect, op, fill):
+    if method == "direct":
+        return _direct(image, kernel, op, fill, reflect)
+    if method == "lut":
+        return _lut(image, kernel, reflect, op is np.minimum)
+    if method == "bits":
+        return unpack(_bits(pack(image), image.shape[-1], kernel, reflect, op is np.minimum), image.shape[-1])
+    top, left, bot, right = _rectangle(kernel)
+    row, col = (kernel.shape[0] - 1) // 2, (kernel.shape[1] - 1) // 2
+    top, left, bot, right = top - row, left - col, bot - row, right - col
+    if reflect:
+        top, bot, left, right = -bot, -top, -right, -left
+    out = _van_herk(image, -2, top, bot - top + 1, op, fill)
+    out = _van_herk(out, -1, left, right - left + 1, op, fill)
+    return out.copy() if out is image else np.ascontiguousarray(out)
+
+def _reduce(image, kernel, method, tol, reflect, op, fill):
+    image, kernel = np.asarray(image), _as_kernel(kernel)
+    if image.ndim < 2 or len(kernel.shape) != 2:
+        raise ValueError("Image must have at least two axes and the kernel exactly two")
+    if method not in METHODS:
+        raise ValueError(f"Method must be in {list(METHODS)}")
+    if not kernel.nnz:
+        raise ValueError("The structuring element must have at least one non-zero coefficient")
+    costs = cost(kernel, tol, image.dtype) if method in ("auto", "decompose") else _costs(kernel, image.dtype)
+    if method == "auto":
+        method = min(costs, key=costs.get)
+    elif method == "van_herk" and method not in costs:
+        raise ValueError("The van_herk method needs a structuring element filling a rectangle")
+    elif method == "bits" and method not in costs:
+        raise ValueError("The bits method needs a boolean image")
+    elif method == "lut" and method not in costs:
+        raise ValueError("The lut method needs a boolean image and a 3x3 structuring element")
+    if method == "decompose":
+        return _decomposed(image, kernel.decompose_morphological(tol)[0], reflect, op, fill)
+    return _apply(image, kernel, method, reflect, op, fill)
+
+def erode(image, kernel, method="auto", tol=0):
+    r"""Flat erosion of the two last axes of an image: each pixel becomes the
+    minimum of the pixels under the non-zero coefficients of the kernel,
+    centered like the "same" convolution mode. The pixels outside the image
+    are ignored. The "auto" method picks, according to :func:`cost`, the
+    shifted-slice reduction over the taps or, for structuring elements
+    filling a rectangle like :func:`kerpy.shapes.square` or a horizontal or
+    vertical line, the van Herk/Gil-Werman running min along each axis,
+    whose cost does not depend on the size of the rectangle, or the
+    sequence of erosions by the small structuring elements of
+    :meth:`Kernel.decompose_morphological`, whose cost grows linearly with
+    the radius of the diamonds. A positive tol allows an approximate
+    decomposition, like the periodic lines of the circles. Boolean images
+    can also be packed by :func:`pack` and eroded with shifted ANDs of 64
+    pixels words by the bits method, or, for 3x3 structuring elements,
+    mapped through the lookup table of their neighborhoods by the lut method.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param method: Algorithm, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :raises ValueError: unknown method, empty structuring element, van_herk
+        method on a structuring element not filling a rectangle, bits or lut
+        method on a non boolean image, lut method on a structuring element which is not 3x3
+    :return: the eroded image, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image)
+    return _reduce(image, kernel, method, tol, False, np.minimum, _limits(image.dtype)[1])
+
+def dilate(image, kernel, method="auto", tol=0):
+    r"""Flat dilation of the two last axes of an image: each pixel becomes the
+    maximum of the pixels under the reflected non-zero coefficients of the
+    kernel, so that the dilation of a binary image is the support of its
+    convolution with the kernel. See :func:`erode` for the methods.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param method: Algorithm, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :raises ValueError: unknown method, empty structuring element, van_herk
+        method on a structuring element not filling a rectangle, bits or lut
+        method on a non boolean image, lut method on a structuring element which is not 3x3
+    :return: the dilated image, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image)
+    return _reduce(image, kernel, method, tol, True, np.maximum, _limits(image.dtype)[0])
+
+def open(image, kernel, method="auto", tol=0):
+    r"""Opening, the dilation of the erosion, removing the bright details
+    smaller than the structuring element.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param method: Algorithm, see :func:`erode`, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :return: the opened image
+    :rtype: np.ndarray
+    """
+    return dilate(erode(image, kernel, method, tol), kernel, method, tol)
+
+def close(image, kernel, method="auto", tol=0):
+    r"""Closing, the erosion of the dilation, filling the dark details
+    smaller than the structuring element.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param method: Algorithm, see :func:`erode`, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :return: the closed image
+    :rtype: np.ndarray
+    """
+    return erode(dilate(image, kernel, method, tol), kernel, method, tol)
+
+def _difference(high, low):
+    return high & ~low if high.dtype == np.bool_ else high - low
+
+def gradient(image, kernel, method="auto", tol=0):
+    r"""Morphological gradient, the dilation minus the erosion, which is
+    non-negative so that unsigned images do not wrap around. Boolean images
+    give the inner and outer boundaries of the objects.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param method: Algorithm, see :func:`erode`, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :return: the gradient, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    return _difference(dilate(image, kernel, method, tol), erode(image, kernel, method, tol))
+
+def tophat(image, kernel, black=False, method="auto", tol=0):
+    r"""White top-hat, the image minus its opening, keeping the bright details
+    smaller than the structuring element, or black top-hat, the closing
+    minus the image, keeping the dark ones.
+
+    :param image: Grayscale or boolean image, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Structuring element, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param black: Computes the black top-hat, defaults to False
+    :type black: bool
+    :param method: Algorithm, see :func:`erode`, defaults to "auto"
+    :type method: "auto"|"direct"|"van_herk"|"decompose"|"bits"|"lut"
+    :param tol: Error budget of the decompose method, see :func:`decompose`, defaults to 0
+    :type tol: float
+    :return: the top-hat, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image)
+    if black:
+        return _difference(close(image, kernel, method, tol), image)
+    return _difference(image, open(image, kernel, method, tol))
@@ -0,0 +1,127 @@
+import numpy as np
+from .Kernel import Kernel
+from .SeparableKernel import SeparableKernel
+from .SparseKernel import SparseKernel
+
+def _read_only(array):
+    r"""Returns a read-only array owning its memory, copying it if needed."""
+    if array.flags.writeable or not array.flags.owndata or not array.flags.c_contiguous:
+        array = np.array(array, order="C")
+        array.setflags(write=False)
+    return array
+
+class FrozenKernel(Kernel):
+    r"""Immutable Kernel with read-only coefficients, which can be shared
+    between threads and used as a dict key. Its content digest is computed
+    once and defines its hash, and two FrozenKernel are equal when their
+    shapes, dtypes and coefficients are equal. Comparisons with anything
+    else stay elementwise. The transforms return a new Kernel, reading the
+    frozen coefficients without copying them.
+
+    :param content: Coefficients of the Kernel, copied unless they are a
+        read-only array owning its memory
+    :type content: Kernel|np.ndarray
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, content):
+        content = content.numpy if isinstance(content, Kernel) else content
+        if not isinstance(content, np.ndarray):
+            raise ValueError("Only nd.array or Kernel are allowed in the FrozenKernel constructor")
+        self._numpy, self._transform = _read_only(content), None
+        self._cache = {}
+        self._key = Kernel._digest(self)
+
+    def __repr__(self) -> str:
+        return f"<kerpy.FrozenKernel numpy =\n{self.numpy.__str__()} at {hex(id(self))}>"
+
+    @property
+    def numpy(self):
+        return Kernel.numpy.fget(self)
+
+    @numpy.setter
+    def numpy(self, content):
+        raise AttributeError("The coefficients of a FrozenKernel are read-only")
+
+    def _digest(self):
+        return self._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenKernel): return self._key == other._key
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        if isinstance(other, FrozenKernel): return self._key != other._key
+        return super().__ne__(other)
+
+    def _thaw(self):
+        r"""Returns a mutable Kernel sharing the frozen coefficients.
+
+        :meta private:
+        """
+        return Kernel(self.numpy)
+
+    def _record(self, matrix, offset, shape, value=None):
+        return self._thaw()._record(matrix, offset, shape, value)
+
+    def divergence(self):
+        return self._thaw().divergence()
+
+    def freeze(self):
+        return self
+
+class FrozenSeparableKernel(FrozenKernel, SeparableKernel):
+    r"""FrozenKernel stored as read-only column and row factors, see
+    :class:`SeparableKernel`. Its digest is the one of the factors, so it is
+    not equal to a dense FrozenKernel of the same coefficients.
+
+    :param column: Column factor of size the Kernel height
+    :type column: np.ndarray
+    :param row: Row factor of size the Kernel width
+    :type row: np.ndarray
+    """
+    # pylint: disable=super-init-not-called,non-parent-init-called
+    def __init__(self, column, row):
+        SeparableKernel.__init__(self, column, row)
+        self._factors = tuple(_read_only(factor) for factor in self._factors)
+        self._key = SeparableKernel._digest(self)
+
+    def __repr__(self) -> str:
+        return f"<kerpy.FrozenSeparableKernel {self.shape} at {hex(id(self))}>"
+
+    def _thaw(self):
+        return SeparableKernel(*self._factors)
+
+class FrozenSparseKernel(FrozenKernel, SparseKernel):
+    r"""FrozenKernel stored as its read-only non-zero taps, see
+    :class:`SparseKernel`. Accessing numpy computes read-only dense
+    coefficients without dropping the taps. Its digest is the one of the
+    taps, so it is not equal to a dense FrozenKernel of the same coefficients.
+
+    :param shape: Shape of the Kernel
+    :type shape: (int, int)
+    :param rows: Rows of the taps
+    :type rows: np.ndarray
+    :param cols: Columns of the taps
+    :type cols: np.ndarray
+    :param weights: Values of the taps
+    :type weights: np.ndarray
+    """
+    # pylint: disable=super-init-not-called,non-parent-init-called
+    def __init__(self, shape, rows, cols, weights):
+        SparseKernel.__init__(self, shape, rows, cols, weights)
+        self._sparse = (self._sparse[0],) + tuple(_read_only(taps) for taps in self._sparse[1:])
+        self._key = SparseKernel._digest(self)
+
+    def __repr__(self) -> str:
+        return f"<kerpy.FrozenSparseKernel of {self._sparse[3].size} taps {self.shape} at {hex(id(self))}>"
+
+    def _materialize(self):
+        ker = self._dense(self._sparse)
+        ker.setflags(write=False)
+        return ker
+
+    def _thaw(self):
+        return SparseKernel(*self._sparse)
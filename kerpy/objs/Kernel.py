@@ -1,13 +1,179 @@
 import numpy as np
+from copy import copy
 from functools import wraps 
+from hashlib import blake2b
+from inspect import signature
+from threading import RLock
+from .LRUCache import LRUCache
+
+SPARSE_DENSITY = 0.5
+r"""Generated Kernels with a lower ratio of non-zero coefficients are stored as a :class:`SparseKernel`"""
+
+_MATERIALIZE_LOCK = RLock()
+
+GENERATOR_CACHE = LRUCache(max_size=0)
+r"""Cache of the generated Kernels, disabled until enabled with :func:`memoize`"""
+
+def memoize(max_size=128, max_bytes=2**26):
+    r"""Enables the cache of the Kernel generators of :mod:`kerpy.diff`,
+    :mod:`kerpy.shapes` and :mod:`kerpy.processing`: calls with the same
+    arguments, defaults included, return the same shared :class:`FrozenKernel`.
+    The hits and misses are counted by :meth:`LRUCache.info`.
+
+    :param max_size: Maximal number of cached Kernels, 0 disables the cache, defaults to 128
+    :type max_size: int|None
+    :param max_bytes: Maximal total size of the cached coefficients in bytes, defaults to 64 MiB
+    :type max_bytes: int|None
+    :return: the cache of the generators
+    :rtype: LRUCache
+    """
+    GENERATOR_CACHE.resize(max_size, max_bytes)
+    if max_size == 0:
+        GENERATOR_CACHE.clear()
+    return GENERATOR_CACHE
+
+def _normalize(value):
+    r"""Returns a hashable value equal for equal arguments, like (3, 3) and [3, 3]."""
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, value.dtype.str, value.tobytes())
+    if isinstance(value, np.generic):
+        return value.item()
+    hash(value)
+    return value
+
 class Kernel:
     def __init__(self, content):
         if not isinstance(content, np.ndarray):
             raise ValueError("Only nd.array are allowed in the Kernel constructor")
         self.numpy = content
+        self._cache = {}
     def __repr__(self) -> str:
         return f"<kerpy.Kernel numpy =\n{self.numpy.__str__()} at {hex(id(self))}>"
 
+    @property
+    def numpy(self):
+        r"""Coefficients of the Kernel. The pad, stride, rot90 and flip
+        transforms are recorded as a single index map of the coefficients
+        before the first one, which are only copied once, on the next access
+        to numpy. The convolutions of a Kernel padded and strided with zeros
+        only use its original coefficients. The coefficients are computed
+        once under a lock, as the threads of a convolution share the Kernel."""
+        if self._numpy is None:
+            with _MATERIALIZE_LOCK:
+                if self._numpy is None:
+                    # Publishes the coefficients before releasing the snapshot
+                    # of the coefficients before the transforms, which the
+                    # other threads read through _transformed()
+                    self._numpy = self._materialize()
+                    self._transform = None
+        return self._numpy
+
+    @numpy.setter
+    def numpy(self, content):
+        self._numpy, self._transform = content, None
+
+    def _materialize(self):
+        base, matrix, offset, shape, value = self._transform
+        ker = np.zeros(shape, dtype=self.dtype) if value == 0 else np.full(shape, value, dtype=self.dtype)
+        if value == 0 and base._numpy is None:
+            rows, cols, weights = self._taps()
+            np.add.at(ker, (rows, cols), weights)
+            return ker
+        # The base coefficients, rotated and flipped, fill a strided slice
+        coefficients = base.numpy.T if matrix[0, 0] == 0 else base.numpy
+        window = []
+        for axis, (step, start) in enumerate(zip(matrix.sum(axis=1), offset)):
+            if step < 0:
+                coefficients = np.flip(coefficients, axis)
+                start, step = start + step * (coefficients.shape[axis] - 1), -step
+            window.append(slice(start, start + step * coefficients.shape[axis], step))
+        ker[tuple(window)] = coefficients
+        return ker
+
+    def _transformed(self):
+        r"""Returns the (base, matrix, offset, shape, value) transform of a
+        Kernel not materialized yet, else None: the coefficient (row, col) of
+        the base Kernel is at matrix @ (row, col) + offset, the others are value.
+
+        :meta private:
+        """
+        return self._transform if self._numpy is None else None
+
+    @staticmethod
+    def _map(transform, rows, cols):
+        _, matrix, offset, _, _ = transform
+        return matrix[0, 0]*rows + matrix[0, 1]*cols + offset[0], matrix[1, 0]*rows + matrix[1, 1]*cols + offset[1]
+
+    def _record(self, matrix, offset, shape, value=None):
+        r"""Composes an affine map of the coefficients, the new ones being
+        value, with the pending transforms.
+
+        :meta private:
+        """
+        transform = self._transformed()
+        if transform is not None and (value is None or value == transform[4]):
+            base, previous, previous_offset, _, value = transform
+            matrix, offset = matrix @ previous, matrix @ previous_offset + offset
+        else:
+            # Snapshot of the current coefficients, without copying them
+            base = copy(self)
+            base._cache = dict(self._cache)
+            value = 0 if value is None else value
+        self.numpy = None
+        self._transform = (base, matrix, offset, tuple(shape), value)
+        return self
+
+    @property
+    def shape(self):
+        r"""Shape of the Kernel"""
+        transform = self._transformed()
+        if transform is not None:
+            return transform[3]
+        return self.numpy.shape
+
+    @property
+    def dtype(self):
+        r"""Data type of the Kernel coefficients"""
+        transform = self._transformed()
+        if transform is not None:
+            return np.result_type(transform[0].dtype, transform[4])
+        return self.numpy.dtype
+
+    @property
+    def nnz(self):
+        r"""Number of non-zero coefficients"""
+        transform = self._transformed()
+        if transform is not None and transform[4] == 0:
+            return transform[0].nnz
+        return np.count_nonzero(self.numpy)
+
+    def to_sparse(self):
+        r"""Store the Kernel as its non-zero taps
+
+        :return: a SparseKernel object
+        :rtype: SparseKernel
+        """
+        # pylint: disable=import-outside-toplevel
+        from .SparseKernel import SparseKernel
+        return SparseKernel(self.shape, *self._taps())
+
+    def freeze(self):
+        r"""Make the coefficients read-only and returns them as an immutable,
+        hashable Kernel. They are shared with the Kernel when they own their
+        memory, else copied.
+
+        :return: a FrozenKernel object
+        :rtype: FrozenKernel
+        """
+        # pylint: disable=import-outside-toplevel
+        from .FrozenKernel import FrozenKernel
+        ker = self.numpy
+        if ker.flags.owndata and ker.flags.c_contiguous:
+            ker.setflags(write=False)
+        return FrozenKernel(ker)
+
     def to_reals(self):
         r"""Compute the real and imaginary part of a complex Kernel
 
@@ -43,15 +209,14 @@ class Kernel:
         :return: a Kernel object
         :rtype: Kernel
         """
-        paddings =  [top,-right,-bot,left]
-        ker = value*np.ones((self.numpy.shape[0] + paddings[0] - paddings[2], self.numpy.shape[0] - paddings[1] + paddings[3]), dtype=self.numpy.dtype)
-        paddings = list(map(lambda x: x if x!=0 else None, paddings))
-        ker[paddings[0]:paddings[2], paddings[3]:paddings[1]] = self.numpy
-        self.numpy = ker
-        return self
+        if min(top, right, bot, left) < 0:
+            raise ValueError("Paddings must be positive")
+        height, width = self.shape
+        return self._record(np.eye(2, dtype=int), np.array([top, left]), (height + top + bot, width + left + right), value)
     
     def stride(self, strides=1, value=0):
-        r"""Add regularly new constant value between coefficients
+        r"""Add regularly new constant value between coefficients, the Kernel
+        being applied like an "a trous" dilated convolution when value is 0
 
         :param strides: Margin width to add between coefficients
         :type strides: int
@@ -60,14 +225,8 @@ class Kernel:
         :return: a Kernel object
         :rtype: Kernel
         """
-        ker = self.numpy
-        strided_ker = value*np.ones((np.array(ker.shape))*(strides+1) + strides)
-        for x in range(ker.shape[0]):
-            for y in range(ker.shape[1]):
-                strided_ker[(strides+1)*x + strides, (strides+1)*y + strides] = ker[x,y]
-
-        self.numpy = strided_ker
-        return self
+        shape = tuple(n * (strides + 1) + strides for n in self.shape)
+        return self._record((strides + 1) * np.eye(2, dtype=int), np.array([strides, strides]), shape, value)
     
     def rot90(self):
         r"""Rotate by 90 degrees
@@ -75,8 +234,8 @@ class Kernel:
         :return: a Kernel object
         :rtype: Kernel
         """
-        self.numpy = np.rot90(self.numpy)
-        return self
+        height, width = self.shape
+        return self._record(np.array([[0, -1], [1, 0]]), np.array([width - 1, 0]), (width, height))
     
     def flip(self):
         r"""Flip a kernel
@@ -84,9 +243,187 @@ class Kernel:
         :return: a Kernel object
         :rtype: Kernel
         """
-        self.numpy = np.flip(self.numpy)
-        return self
-    
+        height, width = self.shape
+        return self._record(-np.eye(2, dtype=int), np.array([height - 1, width - 1]), (height, width))
+
+    def _digest(self):
+        r"""Returns a content digest of the Kernel, from its shape, dtype and coefficients.
+
+        :meta private:
+        """
+        transform = self._transformed()
+        if transform is not None:
+            base, matrix, offset, shape, value = transform
+            digest = blake2b(repr((base._digest(), matrix.tolist(), offset.tolist(), value)).encode(), digest_size=16)
+            return (shape, self.dtype.str, digest.digest())
+        ker = np.ascontiguousarray(self.numpy)
+        return (ker.shape, ker.dtype.str, blake2b(ker.data, digest_size=16).digest())
+
+    def _nbytes(self):
+        r"""Returns the size in bytes of the stored coefficients.
+
+        :meta private:
+        """
+        return self.numpy.nbytes
+
+    def _cached(self, name, compute):
+        r"""Returns compute() memoized until the coefficients change.
+
+        :meta private:
+        """
+        digest = self._digest()
+        if name not in self._cache or self._cache[name][0] != digest:
+            self._cache[name] = (digest, compute())
+        return self._cache[name][1]
+
+    def _taps(self):
+        r"""Returns the rows, columns and values of the non-zero coefficients.
+
+        :meta private:
+        """
+        def compute():
+            transform = self._transformed()
+            if transform is not None and transform[4] == 0:
+                rows, cols, weights = transform[0]._taps()
+                return (*self._map(transform, rows, cols), weights)
+            ker = self.numpy
+            rows, cols = np.nonzero(ker)
+            return rows, cols, ker[rows, cols]
+        return self._cached("taps", compute)
+
+    def _box(self):
+        r"""Returns the (top, left, bot, right) bounds and the value of a Kernel
+        constant on a rectangle and zero elsewhere, else None.
+
+        :meta private:
+        """
+        def compute():
+            rows, cols, weights = self._taps()
+            if not weights.size or np.any(weights != weights[0]):
+                return None
+            top, left, bot, right = rows.min(), cols.min(), rows.max(), cols.max()
+            positions = np.unique(rows * self.shape[1] + cols).size
+            if positions != weights.size or positions != (bot - top + 1) * (right - left + 1):
+                return None
+            return (int(top), int(left), int(bot), int(right)), weights[0]
+        return self._cached("box", compute)
+
+    def _svd(self):
+        ker = self.numpy
+        return self._cached("svd", lambda : np.linalg.svd(ker.astype(np.result_type(ker, np.float64), copy=False)))
+
+    def low_rank(self, tol=0):
+        r"""Approximate the Kernel by a sum of separable kernels using its SVD
+
+        :param tol: Error budget, relative to the Frobenius norm of the Kernel.
+            When 0, the rank is the numerical rank and the sum is exact, defaults to 0
+        :type tol: float
+        :return: a list of (column, row) 1D factors with the sum of their outer products approximating the Kernel
+        :rtype: list
+        """
+        transform = self._transformed()
+        if transform is not None and transform[4] == 0:
+            # Each axis of the Kernel is an axis of its base, the factors of
+            # the base are moved to their transformed positions
+            base, matrix, offset, shape, _ = transform
+            terms = base.low_rank(tol)
+            if matrix[0, 0] == 0:
+                terms = [(row, column) for column, row in terms]
+            return [
+                (self._scatter(column, matrix[0].sum(), offset[0], shape[0]), self._scatter(row, matrix[1].sum(), offset[1], shape[1]))
+                for column, row in terms
+            ]
+        u, s, vh = self._svd()
+        if tol == 0:
+            rank = int(np.sum(s > s[0] * max(self.shape) * np.finfo(s.dtype).eps))
+        else:
+            errors = np.sqrt(np.cumsum(s[::-1]**2)[::-1])
+            rank = int(np.sum(errors > tol * errors[0]))
+        return [(u[:, i] * np.sqrt(s[i]), vh[i] * np.sqrt(s[i])) for i in range(rank)]
+
+    @staticmethod
+    def _scatter(factor, scale, offset, size):
+        out = np.zeros(size, factor.dtype)
+        out[scale * np.arange(factor.size) + offset] = factor
+        return out
+
+    def separate(self):
+        r"""Decompose a rank one Kernel as the outer product of a column and a row
+
+        :return: the (column, row) 1D factors, None if the Kernel is not separable
+        :rtype: tuple|None
+        """
+        terms = self.low_rank()
+        return terms[0] if len(terms) == 1 else None
+
+    def packbits(self):
+        r"""Packs the structuring element of the non-zero coefficients row by
+        row in little-endian 64 bits words, see :func:`kerpy.morphology.pack`
+
+        :return: the (height, ceil(width / 64)) words
+        :rtype: np.ndarray
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..morphology import pack
+        return pack(self.numpy != 0)
+
+    def decompose_morphological(self, tol=0):
+        r"""Decompose the structuring element of the non-zero coefficients as
+        a union of Minkowski sums of small structuring elements, like the two
+        lines of a square, the 3x3 crosses of a diamond or, within an error
+        budget, the periodic lines of a circle, see :func:`kerpy.morphology.decompose`
+
+        :param tol: Error budget, relative to the number of non-zero coefficients. When 0,
+            the decomposition is exact, defaults to 0
+        :type tol: float
+        :return: the terms, lists of structuring elements whose Minkowski sums have the
+            union approximating the Kernel, and the relative error
+        :rtype: (list, float)
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..morphology import decompose
+        return self._cached(f"morphological {tol}", lambda : decompose(self, tol))
+
+    def plan(self, image_shape, dtype=np.float64, mode="same"):
+        r"""Returns the cached FFT plan applying the Kernel to images of a given
+        shape, see :func:`kerpy.convolution.plan`
+
+        :param image_shape: Shape of the images, only the two last axes are used
+        :type image_shape: tuple
+        :param dtype: Data type of the images, defaults to np.float64
+        :type dtype: np.dtype
+        :param mode: Output size, defaults to "same"
+        :type mode: "full"|"same"|"valid"
+        :return: a FFTPlan object
+        :rtype: FFTPlan
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..convolution import plan
+        return plan(self, image_shape, dtype, mode)
+
+    def apply(self, image, mode="same", method="auto", tol=0, workers=None, output="raw"):
+        r"""Convolve an image with the Kernel, see :func:`kerpy.convolution.convolve`
+
+        :param image: Image to convolve, leading axes are batched
+        :type image: np.ndarray
+        :param mode: Output size, defaults to "same"
+        :type mode: "full"|"same"|"valid"
+        :param method: Convolution algorithm, "auto" picks the cheapest one
+        :type method: "auto"|"direct"|"separable"|"fft"|"winograd"|"box"
+        :param tol: Error budget of the separable method, see :meth:`low_rank`, defaults to 0
+        :type tol: float
+        :param workers: Number of threads convolving row bands, defaults to None
+        :type workers: int|None
+        :param output: Returns the response, x + iy for a complex Kernel, its
+            magnitude or its orientation in radians, defaults to "raw"
+        :type output: "raw"|"magnitude"|"orientation"
+        :return: the convolved image
+        :rtype: np.ndarray
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..convolution import convolve
+        return convolve(image, self, mode, method, tol, workers, output)
+
 
     def __add__(self, other): return Kernel(self.numpy.__add__(other.numpy if isinstance(other, Kernel) else other))
     def __sub__(self, other): return Kernel(self.numpy.__sub__(other.numpy if isinstance(other, Kernel) else other) )
@@ -119,7 +456,22 @@ class Kernel:
         """
         :meta private:
         """
+        parameters = signature(func)
+
+        def generate(*args, **kwargs):
+            ker = func(*args, **kwargs)
+            ker = ker if isinstance(ker, Kernel) else Kernel(ker)
+            return ker.to_sparse() if ker.nnz < SPARSE_DENSITY * np.prod(ker.shape) else ker
+
         @wraps(func)
         def wrap(*args, **kwargs):
-            return Kernel( func(*args, **kwargs))
+            if GENERATOR_CACHE.max_size == 0:
+                return generate(*args, **kwargs)
+            try:
+                arguments = parameters.bind(*args, **kwargs)
+                arguments.apply_defaults()
+                key = (func.__module__, func.__qualname__, _normalize(tuple(arguments.arguments.items())))
+            except TypeError:
+                return generate(*args, **kwargs)
+            return GENERATOR_CACHE.get(key, lambda : generate(*args, **kwargs).freeze(), lambda k: k._nbytes())
         return wrap
\ No newline at end of file
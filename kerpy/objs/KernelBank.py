@@ -0,0 +1,131 @@
+import numpy as np
+from .Kernel import Kernel
+
+# Relative costs of gathering one tap of the im2col matrix and of one
+# multiply-add of the matrix product over a direct multiply-add
+GATHER_COST = 1.0
+GEMM_COST = 0.1
+
+
+class KernelBank:
+    r"""Stack of kernels of mixed sizes, zero-padded to a common (K, kh, kw)
+    tensor so that the "same" response of every kernel is unchanged, and
+    applied to an image in a single pass.
+
+    :param kernels: The kernels to stack, or a (K, kh, kw) tensor of kernels of the same size
+    :type kernels: list|np.ndarray
+    """
+    def __init__(self, kernels):
+        if isinstance(kernels, np.ndarray) and kernels.ndim == 3 and len(kernels):
+            self.shapes, self.numpy = [kernels.shape[1:]] * len(kernels), kernels
+            return
+        kernels = [k if isinstance(k, Kernel) else Kernel(np.asarray(k)) for k in kernels]
+        if not kernels or any(len(k.shape) != 2 for k in kernels):
+            raise ValueError("Only a non empty list of 2D kernels is allowed in the KernelBank constructor")
+        self.shapes = [k.shape for k in kernels]
+        height, width = (max(s[axis] for s in self.shapes) for axis in (0, 1))
+        self.numpy = np.zeros((len(kernels), height, width), dtype=np.result_type(*(k.dtype for k in kernels)))
+        for ker, (ker_h, ker_w), layer in zip(kernels, self.shapes, self.numpy):
+            top, left = (height - 1)//2 - (ker_h - 1)//2, (width - 1)//2 - (ker_w - 1)//2
+            layer[top:top + ker_h, left:left + ker_w] = ker.numpy
+
+    def __repr__(self) -> str:
+        return f"<kerpy.KernelBank of {len(self)} kernels {self.numpy.shape[1:]} at {hex(id(self))}>"
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def __getitem__(self, index):
+        (height, width), (ker_h, ker_w) = self.numpy.shape[1:], self.shapes[index]
+        top, left = (height - 1)//2 - (ker_h - 1)//2, (width - 1)//2 - (ker_w - 1)//2
+        return Kernel(self.numpy[index, top:top + ker_h, left:left + ker_w].copy())
+
+    def cost(self, image_shape):
+        r"""Estimates the cost of every method applying the bank, see :func:`kerpy.convolution.cost`
+
+        :param image_shape: Shape of the image, the two last axes are convolved
+        :type image_shape: tuple
+        :return: a dict mapping each method to its estimated cost
+        :rtype: dict
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..convolution import DIRECT_COST, FFT_COST, next_fast_len
+        pixels = int(np.prod(image_shape))
+        layers = self._layers()[0]
+        taps = int(np.count_nonzero(np.any(layers, axis=0)))
+        fft_size = np.prod([next_fast_len(n + k - 1) for n, k in zip(image_shape[-2:], layers.shape[1:])])
+        return {
+            "gemm" : DIRECT_COST * pixels * taps * (GATHER_COST + len(layers) * GEMM_COST),
+            "fft" : FFT_COST / 2 * fft_size * np.log2(fft_size) * (1 + len(layers)) * pixels / np.prod(image_shape[-2:]),
+        }
+
+    def _layers(self):
+        r"""Returns a real (L, kh, kw) tensor of layers, the complex kernels being
+        split in a real and an imaginary layer, and the index of the imaginary
+        layer of every kernel (None for real kernels)."""
+        if not np.iscomplexobj(self.numpy):
+            return self.numpy, [None] * len(self)
+        imaginary = [index for index, layer in enumerate(self.numpy) if np.any(layer.imag)]
+        layers = np.concatenate([self.numpy.real, self.numpy.imag[imaginary]])
+        positions = dict(zip(imaginary, range(len(self), len(layers))))
+        return layers, [positions.get(index) for index in range(len(self))]
+
+    def _combine(self, responses, imaginary):
+        r"""Builds the (..., K, H, W) responses from the responses of the layers."""
+        if all(index is None for index in imaginary):
+            return responses
+        out = responses[..., :len(self), :, :].astype(np.result_type(responses.dtype, np.complex64))
+        for kernel, index in enumerate(imaginary):
+            if index is not None:
+                out[..., kernel, :, :] += 1j * responses[..., index, :, :]
+        return out
+
+    def _gemm(self, image):
+        layers, imaginary = self._layers()
+        ker_h, ker_w = layers.shape[1:]
+        # Correlation with the flipped kernels, on the taps used by any of them
+        taps = np.nonzero(np.any(layers[:, ::-1, ::-1], axis=0))
+        weights = layers[:, ker_h - 1 - taps[0], ker_w - 1 - taps[1]]
+        dtype = np.result_type(image.dtype, layers.dtype, np.float32)
+        weights = weights.astype(dtype)
+        height, width = image.shape[-2:]
+        images = image.reshape((-1, height, width))
+        out = np.empty((len(images), len(layers), height, width), dtype)
+        # Blocks of rows so that the im2col matrix stays around 16 MiB
+        block = max(1, 2**24 // (dtype.itemsize * len(taps[0]) * width))
+        for padded, responses in zip(images, out):
+            padded = np.pad(padded, [(ker_h//2, (ker_h - 1)//2), (ker_w//2, (ker_w - 1)//2)])
+            for top in range(0, height, block):
+                bot = min(top + block, height)
+                columns = np.empty((len(taps[0]), bot - top, width), dtype)
+                for column, i, j in zip(columns, *taps):
+                    column[...] = padded[top + i:bot + i, j:j + width]
+                responses[:, top:bot] = (weights @ columns.reshape(len(columns), -1)).reshape(-1, bot - top, width)
+        return self._combine(out.reshape(image.shape[:-2] + out.shape[1:]), imaginary)
+
+    def apply(self, image, method="auto"):
+        r"""Convolves an image with every kernel of the bank, in "same" mode.
+        The "fft" method computes the spectrum of the image once, the "gemm"
+        method gathers the shifted views of the image once and multiplies
+        them with the bank in a single matrix product.
+
+        :param image: Image to convolve, leading axes are batched
+        :type image: np.ndarray
+        :param method: Convolution algorithm, defaults to "auto"
+        :type method: "auto"|"gemm"|"fft"
+        :return: the responses of shape (..., K, H, W)
+        :rtype: np.ndarray
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..convolution import plan
+        image = np.asarray(image)
+        if method == "auto":
+            costs = self.cost(image.shape)
+            method = min(costs, key=costs.get)
+        if method == "gemm":
+            return self._gemm(image)
+        if method == "fft":
+            layers, imaginary = self._layers()
+            fft_plan = plan(layers, image.shape, image.dtype)
+            return self._combine(fft_plan.execute(image) if image.ndim == 2 else fft_plan.execute_batch(image), imaginary)
+        raise ValueError("Method must be in ['auto', 'gemm', 'fft']")
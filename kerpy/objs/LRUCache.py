@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from threading import Lock
+
+class LRUCache:
+    r"""Thread-safe least recently used cache bounded in number of entries
+    and in bytes, counting its hits and misses.
+
+    :param max_size: Maximal number of entries, None for no limit
+    :type max_size: int|None
+    :param max_bytes: Maximal total size of the entries in bytes, None for no limit
+    :type max_bytes: int|None
+    """
+    def __init__(self, max_size=None, max_bytes=None):
+        self.max_size, self.max_bytes = max_size, max_bytes
+        self.hits = self.misses = self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute, nbytes=lambda value: 0):
+        r"""Returns the value of key, calling compute() on a miss
+
+        :param key: Hashable key
+        :param compute: Function without argument computing the value
+        :type compute: callable
+        :param nbytes: Function returning the size in bytes of a value
+        :type nbytes: callable
+        :return: the cached value
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+        value = compute()
+        size = nbytes(value)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.nbytes += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            (self.max_size is not None and len(self._entries) > self.max_size)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+
+    def resize(self, max_size=None, max_bytes=None):
+        r"""Changes the bounds of the cache, evicting entries if needed"""
+        with self._lock:
+            self.max_size, self.max_bytes = max_size, max_bytes
+            self._evict()
+
+    def clear(self):
+        r"""Removes all entries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.nbytes = 0
+
+    def info(self):
+        r"""Returns the counters of the cache
+
+        :return: a dict with hits, misses, size, nbytes, max_size and max_bytes
+        :rtype: dict
+        """
+        return {
+            "hits" : self.hits, "misses" : self.misses, "size" : len(self._entries),
+            "nbytes" : self.nbytes, "max_size" : self.max_size, "max_bytes" : self.max_bytes
+        }
@@ -0,0 +1,83 @@
+import numpy as np
+from hashlib import blake2b
+from .Kernel import Kernel
+
+class SeparableKernel(Kernel):
+    r"""Kernel stored as the outer product of a column and a row. The dense
+    coefficients are only computed, read-only, on the first access to numpy.
+    Assigning numpy turns it back into a dense Kernel.
+
+    :param column: Column factor of size the Kernel height
+    :type column: np.ndarray
+    :param row: Row factor of size the Kernel width
+    :type row: np.ndarray
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, column, row):
+        column, row = np.asarray(column), np.asarray(row)
+        if column.ndim != 1 or row.ndim != 1:
+            raise ValueError("Only 1D factors are allowed in the SeparableKernel constructor")
+        self._factors = (column, row)
+        self._numpy, self._transform = None, None
+        self._cache = {}
+
+    @property
+    def numpy(self):
+        return Kernel.numpy.fget(self)
+
+    @numpy.setter
+    def numpy(self, content):
+        self._factors = None
+        Kernel.numpy.fset(self, content)
+
+    def _materialize(self):
+        if self._factors is None: return super()._materialize()
+        ker = np.outer(*self._factors)
+        ker.setflags(write=False)
+        return ker
+
+    @property
+    def shape(self):
+        if self._factors is None: return super().shape
+        return tuple(f.size for f in self._factors)
+
+    @property
+    def dtype(self):
+        if self._factors is None: return super().dtype
+        return np.result_type(*self._factors)
+
+    @property
+    def nnz(self):
+        if self._factors is None: return super().nnz
+        return int(np.prod([np.count_nonzero(f) for f in self._factors]))
+
+    def _digest(self):
+        if self._factors is None: return super()._digest()
+        digest = blake2b(digest_size=16)
+        for factor in self._factors:
+            digest.update(np.ascontiguousarray(factor).data)
+        return (self.shape, self.dtype.str, digest.digest())
+
+    def _nbytes(self):
+        if self._factors is None: return super()._nbytes()
+        return sum(factor.nbytes for factor in self._factors)
+
+    def freeze(self):
+        r"""Make the factors read-only and returns them as an immutable,
+        hashable Kernel, without computing the dense coefficients.
+
+        :return: a FrozenSeparableKernel object
+        :rtype: FrozenSeparableKernel
+        """
+        if self._factors is None: return super().freeze()
+        # pylint: disable=import-outside-toplevel
+        from .FrozenKernel import FrozenSeparableKernel
+        return FrozenSeparableKernel(*self._factors)
+
+    def low_rank(self, tol=0):
+        if self._factors is None: return super().low_rank(tol)
+        return [self._factors] if self.nnz else []
+
+    def separate(self):
+        if self._factors is None: return super().separate()
+        return self._factors if self.nnz else None
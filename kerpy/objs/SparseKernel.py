@@ -0,0 +1,125 @@
+import numpy as np
+from hashlib import blake2b
+from .Kernel import Kernel
+
+class SparseKernel(Kernel):
+    r"""Kernel stored as the rows, columns and values of its non-zero taps,
+    applied as a sum of shifted views of the image. The dense coefficients
+    are only computed on the first access to numpy, the Kernel being dense
+    afterwards. Taps at the same position are summed and the zero ones are
+    dropped, so that the stored taps are the non-zero coefficients. The taps
+    are read once by each method, as the threads of a convolution share the
+    Kernel while another one may make it dense.
+
+    :param shape: Shape of the Kernel
+    :type shape: (int, int)
+    :param rows: Rows of the taps
+    :type rows: np.ndarray
+    :param cols: Columns of the taps
+    :type cols: np.ndarray
+    :param weights: Values of the taps
+    :type weights: np.ndarray
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, shape, rows, cols, weights):
+        rows, cols, weights = np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp), np.asarray(weights)
+        if len(shape) != 2 or rows.ndim != 1 or not rows.shape == cols.shape == weights.shape:
+            raise ValueError("Only 1D taps of the same size and a 2D shape are allowed in the SparseKernel constructor")
+        if rows.size and (min(rows.min(), cols.min()) < 0 or rows.max() >= shape[0] or cols.max() >= shape[1]):
+            raise ValueError("Taps must be inside the shape of the SparseKernel")
+        if rows.size:
+            positions, inverse = np.unique(rows * shape[1] + cols, return_inverse=True)
+            merged = np.zeros(positions.size, weights.dtype)
+            np.add.at(merged, inverse, weights)
+            positions, weights = positions[merged != 0], merged[merged != 0]
+            rows, cols = positions // shape[1], positions % shape[1]
+        self._sparse = (tuple(shape), rows, cols, weights)
+        self._numpy, self._transform = None, None
+        self._cache = {}
+
+    def __repr__(self) -> str:
+        sparse = self._sparse
+        if sparse is None: return super().__repr__()
+        return f"<kerpy.SparseKernel of {sparse[3].size} taps {sparse[0]} at {hex(id(self))}>"
+
+    @property
+    def numpy(self):
+        ker = Kernel.numpy.fget(self)
+        # The taps are dropped once the dense coefficients are published
+        self._sparse = None
+        return ker
+
+    @numpy.setter
+    def numpy(self, content):
+        self._sparse = None
+        Kernel.numpy.fset(self, content)
+
+    @staticmethod
+    def _dense(sparse):
+        shape, rows, cols, weights = sparse
+        ker = np.zeros(shape, dtype=weights.dtype)
+        np.add.at(ker, (rows, cols), weights)
+        return ker
+
+    def _materialize(self):
+        sparse = self._sparse
+        if sparse is None: return super()._materialize()
+        return self._dense(sparse)
+
+    @property
+    def shape(self):
+        sparse = self._sparse
+        if sparse is None: return super().shape
+        return sparse[0]
+
+    @property
+    def dtype(self):
+        sparse = self._sparse
+        if sparse is None: return super().dtype
+        return sparse[3].dtype
+
+    @property
+    def nnz(self):
+        sparse = self._sparse
+        if sparse is None: return super().nnz
+        return sparse[3].size
+
+    def _digest(self):
+        sparse = self._sparse
+        if sparse is None: return super()._digest()
+        digest = blake2b(digest_size=16)
+        for taps in sparse[1:]:
+            digest.update(np.ascontiguousarray(taps).data)
+        return (sparse[0], sparse[3].dtype.str, digest.digest())
+
+    def _nbytes(self):
+        sparse = self._sparse
+        if sparse is None: return super()._nbytes()
+        return sum(taps.nbytes for taps in sparse[1:])
+
+    def _taps(self):
+        sparse = self._sparse
+        if sparse is None: return super()._taps()
+        return sparse[1:]
+
+    def _svd(self):
+        sparse = self._sparse
+        if sparse is None: return super()._svd()
+        return self._cached("svd", lambda : Kernel(self._dense(sparse))._svd())
+
+    def to_sparse(self):
+        if self._sparse is None: return super().to_sparse()
+        return self
+
+    def freeze(self):
+        r"""Make the taps read-only and returns them as an immutable, hashable
+        Kernel, without computing the dense coefficients.
+
+        :return: a FrozenSparseKernel object
+        :rtype: FrozenSparseKernel
+        """
+        sparse = self._sparse
+        if sparse is None: return super().freeze()
+        # pylint: disable=import-outside-toplevel
+        from .FrozenKernel import FrozenSparseKernel
+        return FrozenSparseKernel(*sparse)
@@ -1,10 +1,13 @@
 """Generate image processing kernels"""
+from functools import lru_cache
 import numpy as np
 from .diff import laplacian
 from .objs.Kernel import Kernel
+from .objs.SeparableKernel import SeparableKernel
+from .objs.KernelBank import KernelBank
 
 @Kernel.decorator
-def gaussian(size=(3,3), std=(1,1), normalize=True) -> Kernel:
+def gaussian(size=(3,3), std=(1,1), normalize=True, factored=False) -> Kernel:
     r"""Returns a real kernel that corresponds to the
     gaussian kernel.
 
@@ -27,17 +30,135 @@ def gaussian(size=(3,3), std=(1,1), normalize=True) -> Kernel:
     :param normalize: Set the sum of all coefficients equal to one
         to conserve to global mass.
     :type normalize: bool
+    :param factored: Only compute the 1D factors and return a SeparableKernel
+    :type factored: bool
     :return: a Kernel object
     :rtype: Kernel
     """
+    if factored:
+        column = np.exp(-((np.arange(size[1])-(size[1]-1)//2)**2)/(2*std[1]**2))
+        row = np.exp(-((np.arange(size[0])-(size[0]-1)//2)**2)/(2*std[0]**2))
+        return SeparableKernel(column/np.sum(column), row/np.sum(row)) if normalize else SeparableKernel(column, row)
     x_arr,y_arr = np.meshgrid(np.arange(0,size[0]),np.arange(0,size[1]))
     x_c = (size[0]-1)//2
     y_c = (size[1]-1)//2
     ker = np.exp(-(((x_arr-x_c)**2)/(2*std[0]**2) + ((y_arr-y_c)**2)/(2*std[1]**2)))
     return ker/np.sum(ker) if normalize else ker
 
+def gaussian_batch(size=(3,3), stds=((1,1),), normalize=True) -> KernelBank:
+    r"""Returns the gaussian kernels of many standard deviations at once,
+    equal to :func:`gaussian` for each of them. The kernels are the outer
+    products of 1D profiles computed for the whole sweep on shared
+    coordinates.
+
+    :param size: Tuple defining the size of the kernels respectively
+        in the x and y direction, defaults to (3,3)
+    :type size: (int, int)
+    :param stds: The (x, y) standard deviations of every kernel, or one
+        standard deviation for both directions, defaults to ((1,1),)
+    :type stds: np.ndarray
+    :param normalize: Set the sum of the coefficients of every kernel equal to one
+    :type normalize: bool
+    :return: a KernelBank object of (N, size[1], size[0]) coefficients
+    :rtype: KernelBank
+    """
+    stds = np.asarray(stds, dtype=np.float64)
+    stds = np.stack([stds, stds], axis=-1) if stds.ndim == 1 else stds
+    row, column = (
+        np.exp(-((np.arange(n)-(n-1)//2)**2)/(2*stds[:, axis, None]**2))
+        for axis, n in enumerate(size)
+    )
+    ker = column[:, :, None] * row[:, None, :]
+    return KernelBank(ker/np.sum(ker, axis=(1, 2), keepdims=True) if normalize else ker)
+
+def gaussian_iir(image, std=(1,1)):
+    r"""Filters the two last axes of an image with a recursive gaussian
+    (Young and van Vliet), with zero boundaries like the "same" mode of
+    :func:`kerpy.convolution.convolve`. Its cost per pixel does not depend
+    on std: each axis is filtered by a causal and an anti-causal third order
+    recursion, vectorized over the other axes.
+
+    Compared to the convolution with a :func:`gaussian` kernel of size
+    2*ceil(4*std)+1, the largest error relative to the largest response is
+    7% for std=1, 3% for std=3 and 2% for std >= 5 on an impulse, and 3%
+    for std=1 and below 1% for std >= 2 on a noise image, see
+    benchmarks/gaussian_iir.py.
+
+    :param image: Image to filter, leading axes are batched
+    :type image: np.ndarray
+    :param std: Tuple defining the standard deviation of the gaussian
+        respectively in the x and y direction, at least 0.5, defaults to (1,1)
+    :type std: (float, float)
+    :raises ValueError: std lower than 0.5
+    :return: the filtered image
+    :rtype: np.ndarray
+    """
+    std = (std, std) if np.isscalar(std) else std
+    if min(std) < 0.5:
+        raise ValueError("Standard deviations must be at least 0.5")
+    out = np.asarray(image, dtype=np.result_type(np.asarray(image).dtype, np.float64))
+    for axis, sigma in ((-1, std[0]), (-2, std[1])):
+        out = _recursive_gaussian(out, float(sigma), axis)
+    return out
+
+# Poles of the third order recursive gaussian of std 2 (van Vliet, Young
+# and Verbeek, 1998), other stds scale them by a power 1/q
+RECURSIVE_POLES = np.array([1.41650 + 1.00829j, 1.41650 - 1.00829j, 1.86543])
+
+@lru_cache(maxsize=64)
+def _recursive_coefficients(std):
+    r"""Returns the gain B, the feedback coefficients (a1, a2, a3) and the
+    matrix M giving the initial state of the anti-causal pass from the final
+    state of the causal one, for zero boundaries (Triggs and Sdika, 2006).
+    """
+    # The variance of the causal and anti-causal passes grows with q, which
+    # is found by bisection so that it is exactly std**2
+    variance = lambda q: 2 * np.sum(np.real((p := RECURSIVE_POLES**(-1/q)) / (1 - p)**2))
+    low, high = 1e-3, 4 * max(1., std)
+    for _ in range(64):
+        scale = np.sqrt(low * high)
+        low, high = (scale, high) if variance(scale) < std**2 else (low, scale)
+    poles = RECURSIVE_POLES**(-1/scale)
+    feedback = -np.real(np.poly(poles))[1:]
+    gain = 1 - np.sum(feedback)
+    # Free response of the causal pass after the end of the signal, then
+    # anti-causal pass over it, for each basis state, until it vanishes
+    length = int(np.ceil(np.log(np.finfo(np.float64).eps) / np.log(np.max(np.abs(poles))))) + 3
+    causal = np.zeros((length + 3, 3))
+    causal[:3] = np.eye(3)[::-1]
+    for i in range(3, length + 3):
+        causal[i] = feedback @ causal[i - 3:i][::-1]
+    anti = np.zeros((length + 6, 3))
+    for i in range(length + 2, 2, -1):
+        anti[i] = gain * causal[i] + feedback @ anti[i + 1:i + 4]
+    return gain, feedback, anti[3:6]
+
+def _recursive_gaussian(image, std, axis):
+    gain, (a1, a2, a3), matrix = _recursive_coefficients(std)
+    # The filtered axis goes first, so that each step is a contiguous row
+    data = np.moveaxis(image, axis, 0)
+    length = data.shape[0]
+    work = np.zeros((length + 6,) + data.shape[1:], dtype=image.dtype)
+    work[3:length + 3] = data
+    tmp = np.empty_like(work[0])
+    for i in range(3, length + 3):
+        row = work[i]
+        row *= gain
+        for coefficient, previous in ((a1, i - 1), (a2, i - 2), (a3, i - 3)):
+            np.multiply(work[previous], coefficient, out=tmp)
+            row += tmp
+    state = work[length:length + 3][::-1].copy()
+    work[length + 3:] = np.tensordot(matrix, state, axes=1)
+    for i in range(length + 2, 2, -1):
+        row = work[i]
+        row *= gain
+        for coefficient, following in ((a1, i + 1), (a2, i + 2), (a3, i + 3)):
+            np.multiply(work[following], coefficient, out=tmp)
+            row += tmp
+    return np.moveaxis(work[3:length + 3], 0, axis)
+
 @Kernel.decorator
-def mean(size=(3,3)) -> Kernel:
+def mean(size=(3,3), factored=False) -> Kernel:
     r"""Returns a real kernel that corresponds to the ones matrix
     divided the number of element.
 
@@ -54,11 +175,16 @@ def mean(size=(3,3)) -> Kernel:
     :param size: Tuple defining the size of the kernel respectively
         in the x and y direction, defaults to (3,3)
     :type size: (int, int)
+    :param factored: Only compute the 1D factors and return a SeparableKernel
+    :type factored: bool
     :return: a Kernel object
     :rtype: Kernel
     """
+    if factored:
+        return SeparableKernel(np.ones(size[0])/size[0], np.ones(size[1])/size[1])
     return np.ones(size)/np.prod(size)
 
+@Kernel.decorator
 def sharpen(size : tuple[int, int]=(3,3)) -> Kernel:
     r"""Returns the identitical kernel plus the laplacian in
     order to sharpen an image.
@@ -80,10 +206,11 @@ def sharpen(size : tuple[int, int]=(3,3)) -> Kernel:
     :rtype: Kernel
     """
     ker : Kernel = laplacian()
-    # pylint: disable=no-member
-    ker.numpy[(size[0]-1)//2,(size[1]-1)//2] +=1
-    return ker
+    center = np.zeros(ker.shape, dtype=ker.dtype)
+    center[(size[0]-1)//2,(size[1]-1)//2] = 1
+    return ker + center
 
+@Kernel.decorator
 def unsharp(size=(3,3), std=(1,1)) -> Kernel:
     r"""Returns a real kernel that corresponds to the gaussian kernel minus 
     two times the identity kernel.
@@ -108,6 +235,6 @@ def unsharp(size=(3,3), std=(1,1)) -> Kernel:
     :rtype: Kernel
     """
     ker : Kernel = gaussian(size, std, True)
-    ker.numpy[(size[0]-1)//2,(size[1]-1)//2] -= 2
-    ker.numpy *= -1
-    return ker
+    center = np.zeros(ker.shape, dtype=ker.dtype)
+    center[(size[0]-1)//2,(size[1]-1)//2] = 2
+    return (ker - center) * -1
@@ -0,0 +1,171 @@
+"""Build Gaussian and Laplacian pyramids and scale-spaces with processing.gaussian"""
+import numpy as np
+
+from . import processing
+
+TRUNCATE = 4.0
+r"""Radius of the gaussian kernels in standard deviations"""
+
+def _weights(std):
+    r"""Returns the normalized 1D gaussian of :func:`kerpy.processing.gaussian`
+    truncated at :data:`TRUNCATE` standard deviations.
+    """
+    size = 2 * int(np.ceil(TRUNCATE * std)) + 1
+    return processing.gaussian((size, 1), (std, std), factored=True).numpy.ravel()
+
+def _fold(window, weights, out, buffer):
+    r"""Sums the windows of the taps weighted by symmetric weights into out,
+    the two windows of a pair of taps being added before the multiply.
+    """
+    radius = weights.size // 2
+    np.multiply(window(radius), weights[radius], out=out)
+    for tap in range(radius):
+        np.add(window(tap), window(2 * radius - tap), out=buffer)
+        buffer *= weights[tap]
+        out += buffer
+
+def _blur(image, std, out, step=1):
+    r"""Separable gaussian blur with reflected boundaries, computed only at
+    every step-th row and column and written to out.
+    """
+    weights = _weights(std).astype(out.dtype)
+    radius = weights.size // 2
+    pad = [(0, 0)] * (image.ndim - 2) + [(radius, radius), (radius, radius)]
+    padded = np.pad(image.astype(out.dtype, copy=False), pad, mode="reflect")
+    height, width = out.shape[-2:]
+    rows = np.empty(image.shape[:-2] + (height, padded.shape[-1]), out.dtype)
+    _fold(lambda start: padded[..., start:start + step * (height - 1) + 1:step, :], weights, rows, np.empty_like(rows))
+    _fold(lambda start: rows[..., start:start + step * (width - 1) + 1:step], weights, out, np.empty(out.shape, out.dtype))
+    return out
+
+def _levels(shape, count):
+    r"""Returns the shapes of the levels halving the two last axes, until a
+    side is 1 or the count is reached.
+    """
+    shapes = [tuple(shape)]
+    while (count is None or len(shapes) < count) and min(shapes[-1][-2:]) > 1:
+        shapes.append(shapes[-1][:-2] + (-(-shapes[-1][-2] // 2), -(-shapes[-1][-1] // 2)))
+    return shapes
+
+def _allocate(shapes, dtype):
+    r"""Returns views of the given shapes into a single contiguous buffer."""
+    sizes = [int(np.prod(shape, dtype=np.int64)) for shape in shapes]
+    buffer = np.empty(sum(sizes), dtype)
+    starts = np.cumsum([0] + sizes)
+    return [buffer[start:start + size].reshape(shape) for start, size, shape in zip(starts, sizes, shapes)]
+
+def _expand(image, shape, std):
+    r"""Upsamples an image to a shape by inserting zeros and blurring, the
+    gain of 4 restoring the mean.
+    """
+    upsampled = np.zeros(shape, image.dtype)
+    upsampled[..., ::2, ::2] = image
+    return 4 * _blur(upsampled, std, np.empty(shape, image.dtype))
+
+def gaussian_pyramid(image, levels=None, std=1.0):
+    r"""Builds the Gaussian pyramid of an image: each level is the previous
+    one blurred by a gaussian of standard deviation std, with reflected
+    boundaries, and decimated by 2, the blur being only computed at the kept
+    rows and columns. The total work is about 4/3 of one full-resolution
+    blur. The levels are views into a single preallocated contiguous buffer.
+
+    :param image: Image, leading axes are batched
+    :type image: np.ndarray
+    :param levels: Number of levels, the image included, defaults to None
+        for halving until a side is 1
+    :type levels: int|None
+    :param std: Standard deviation of the blur between levels, defaults to 1.0
+    :type std: float
+    :raises ValueError: image with less than two axes, non-positive number of levels
+    :return: the levels, from the full resolution one
+    :rtype: list
+    """
+    image = np.asarray(image)
+    if image.ndim < 2:
+        raise ValueError("Image must have at least two axes")
+    if levels is not None and levels < 1:
+        raise ValueError("A pyramid has at least one level")
+    pyramid = _allocate(_levels(image.shape, levels), np.result_type(image, np.float32))
+    pyramid[0][...] = image
+    for previous, level in zip(pyramid, pyramid[1:]):
+        _blur(previous, std, level, step=2)
+    return pyramid
+
+def laplacian_pyramid(image, levels=None, std=1.0):
+    r"""Builds the Laplacian pyramid of an image: each level is the difference
+    between a level of the Gaussian pyramid and the expansion of the next
+    one, the last level being the coarsest Gaussian level. The differences
+    are computed in place in the buffer of :func:`gaussian_pyramid`.
+
+    :param image: Image, leading axes are batched
+    :type image: np.ndarray
+    :param levels: Number of levels, defaults to None for halving until a side is 1
+    :type levels: int|None
+    :param std: Standard deviation of the blur between levels, defaults to 1.0
+    :type std: float
+    :return: the levels, from the full resolution one
+    :rtype: list
+    """
+    pyramid = gaussian_pyramid(image, levels, std)
+    for level, coarser in zip(pyramid, pyramid[1:]):
+        level -= _expand(coarser, level.shape, std)
+    return pyramid
+
+def collapse(pyramid, std=1.0):
+    r"""Reconstructs the image of a Laplacian pyramid, exactly up to rounding.
+
+    :param pyramid: Levels of :func:`laplacian_pyramid`
+    :type pyramid: list
+    :param std: Standard deviation of the blur of the pyramid, defaults to 1.0
+    :type std: float
+    :return: the image
+    :rtype: np.ndarray
+    """
+    image = np.array(pyramid[-1])
+    for level in pyramid[-2::-1]:
+        image = level + _expand(image, level.shape, std)
+    return image
+
+def scale_space(image, octaves=None, scales=3, std=1.6, initial_std=0.5):
+    r"""Builds an octave-based gaussian scale-space, like the one of SIFT. The
+    octave o holds scales + 3 levels, the level i having the standard
+    deviation std * 2**(o + i / scales) in pixels of the image. Each level is
+    blurred from the previous one with the differential standard deviation,
+    and the first level of an octave is the level of twice the base
+    standard deviation of the previous octave decimated by 2, so that each
+    octave costs about a quarter of the previous one. The octaves are
+    views into a single preallocated contiguous buffer, and their
+    differences along the levels axis are the differences of gaussians.
+
+    :param image: Image, leading axes are batched
+    :type image: np.ndarray
+    :param octaves: Number of octaves, defaults to None for halving until a side is 1
+    :type octaves: int|None
+    :param scales: Number of intervals per octave, defaults to 3
+    :type scales: int
+    :param std: Standard deviation of the first level, defaults to 1.6
+    :type std: float
+    :param initial_std: Standard deviation of the blur already in the image, defaults to 0.5
+    :type initial_std: float
+    :raises ValueError: image with less than two axes, non-positive number of octaves or scales
+    :return: the (..., scales + 3, height, width) octaves
+    :rtype: list
+    """
+    image = np.asarray(image)
+    if image.ndim < 2:
+        raise ValueError("Image must have at least two axes")
+    if (octaves is not None and octaves < 1) or scales < 1:
+        raise ValueError("A scale-space has at least one octave and one scale")
+    shapes = [shape[:-2] + (scales + 3,) + shape[-2:] for shape in _levels(image.shape, octaves)]
+    space = _allocate(shapes, np.result_type(image, np.float32))
+    stds = std * 2**(np.arange(scales + 3) / scales)
+    for index, octave in enumerate(space):
+        if index == 0 and std > initial_std:
+            _blur(image, np.sqrt(std**2 - initial_std**2), octave[..., 0, :, :])
+        elif index == 0:
+            octave[..., 0, :, :] = image
+        else:
+            octave[..., 0, :, :] = space[index - 1][..., scales, ::2, ::2]
+        for level in range(1, scales + 3):
+            _blur(octave[..., level - 1, :, :], np.sqrt(stds[level]**2 - stds[level - 1]**2), octave[..., level, :, :])
+    return space
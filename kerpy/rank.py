@@ -0,0 +1,175 @@
+"""Rank, median and percentile filters over the footprints of kerpy.shapes"""
+import numpy as np
+
+from .convolution import _as_kernel
+
+HISTOGRAM_DTYPES = (np.uint8, np.uint16)
+r"""Data types filtered with sliding histograms, the other ones being partitioned"""
+
+def _footprint(kernel):
+    r"""Returns the row and column offsets of the non-zero coefficients of a
+    kernel relative to its center.
+    """
+    kernel = _as_kernel(kernel)
+    if len(kernel.shape) != 2:
+        raise ValueError("The footprint must have exactly two axes")
+    rows, cols, _ = kernel._taps() # pylint: disable=protected-access
+    if not rows.size:
+        raise ValueError("The footprint must have at least one non-zero coefficient")
+    return rows - (kernel.shape[0] - 1) // 2, cols - (kernel.shape[1] - 1) // 2
+
+def _padded(image, rows, cols):
+    r"""Pads the image with its edges by the extent of the footprint and
+    returns the offsets of the taps in the padded image.
+    """
+    top, left = max(0, -rows.min()), max(0, -cols.min())
+    pad = [(0, 0)] * (image.ndim - 2) + [(top, max(0, rows.max())), (left, max(0, cols.max()))]
+    return np.pad(image, pad, mode="edge"), rows + top, cols + left
+
+def _partition(image, rows, cols, rank, block_bytes):
+    r"""Gathers the taps of bands of rows in a reused buffer and partitions
+    them around the rank, with an average cost linear in the number of taps.
+    """
+    padded, rows, cols = _padded(image, rows, cols)
+    height, width = image.shape[-2:]
+    batch = int(np.prod(image.shape[:-2], dtype=np.int64))
+    band = max(1, min(height, block_bytes // (batch * width * rows.size * image.itemsize)))
+    out = np.empty(image.shape, image.dtype)
+    buffer = np.empty(image.shape[:-2] + (band, width, rows.size), image.dtype)
+    for start in range(0, height, band):
+        stop = min(height, start + band)
+        taps = buffer[..., :stop - start, :, :]
+        for tap, (i, j) in enumerate(zip(rows, cols)):
+            taps[..., tap] = padded[..., start + i:stop + i, j:j + width]
+        taps.partition(rank, axis=-1)
+        out[..., start:stop, :] = taps[..., rank]
+    return out
+
+def _update(hists, flat, positions, weights, lines, fine):
+    r"""Adds the weights of the taps at the positions of the flat padded image
+    to the fine and coarse histograms of every line.
+    """
+    found = np.take(flat, positions).astype(np.intp)
+    weights = np.broadcast_to(weights[:, None], found.shape).ravel()
+    coarse = hists[1].size // lines.size
+    np.add.at(hists[0], (lines * fine * coarse + found).ravel(), weights)
+    np.add.at(hists[1], (lines * coarse + found // fine).ravel(), weights)
+
+def _histogram(image, rows, cols, rank, block_bytes):
+    r"""Slides the histograms of the footprints of all the rows of a band at
+    once along the columns, like Huang's algorithm: moving by one column
+    removes the taps of the left edge of the footprint and adds the ones of
+    its right edge. The rank is searched in a coarse histogram of sqrt(bins)
+    bins then in the fine bins of the found coarse bin, like Perreault and
+    Hebert. The values are first mapped to the indices of the distinct
+    values of the image, bounding the number of bins.
+    """
+    present = np.bincount(image.ravel(), minlength=1) > 0
+    values = np.flatnonzero(present).astype(image.dtype)
+    index = (np.cumsum(present) - 1).astype(image.dtype)[image]
+    fine = int(np.ceil(np.sqrt(values.size)))
+    coarse = -(-values.size // fine)
+    padded, rows, cols = _padded(index, rows, cols)
+    height, width = image.shape[-2:]
+    band = max(1, min(height, block_bytes // (8 * fine * coarse)))
+
+    # The taps leaving the footprint, one column to the left, and the ones
+    # entering it when it moves right
+    taps = set(zip(rows.tolist(), cols.tolist()))
+    leaving = [(i, j - 1) for i, j in taps if (i, j - 1) not in taps]
+    entering = [(i, j) for i, j in taps if (i, j + 1) not in taps]
+    edges, signs = np.array(leaving + entering), np.repeat([-1, 1], [len(leaving), len(entering)])
+    out = np.empty(image.shape, image.dtype)
+    for batch in np.ndindex(image.shape[:-2]):
+        flat = padded[batch].ravel()
+        for start in range(0, height, band):
+            lines = np.arange(min(band, height - start))
+            hists = np.zeros(lines.size * fine * coarse, np.int64), np.zeros(lines.size * coarse, np.int64)
+            positions = lambda offsets: (start + lines + offsets[:, :1]) * padded.shape[-1] + offsets[:, 1:]
+            _update(hists, flat, positions(np.stack([rows, cols], axis=-1)), np.ones(rows.size, np.int64), lines, fine)
+            edge_positions = positions(edges)
+            for column in range(width):
+                if column:
+                    _update(hists, flat, edge_positions + column, signs, lines, fine)
+                counts = hists[1].reshape(lines.size, coarse)
+                below = np.cumsum(counts, axis=1)
+                bins = np.argmax(below > rank, axis=1)
+                below = below[lines, bins] - counts[lines, bins]
+                counts = hists[0].reshape(lines.size, coarse, fine)[lines, bins]
+                found = bins * fine + np.argmax(np.cumsum(counts, axis=1) + below[:, None] > rank, axis=1)
+                out[batch + (slice(start, start + lines.size), column)] = values[found]
+    return out
+
+def rank_filter(image, kernel, rank, block_bytes=2**24):
+    r"""Replaces each pixel by the value of a given rank among the pixels
+    under the non-zero coefficients of the kernel, like the footprints of
+    :mod:`kerpy.shapes`, centered like the "same" convolution mode, the
+    pixels outside the image being the nearest edge pixel. The rank 0 is
+    the minimum and -1 the maximum.
+
+    The uint8 and uint16 images slide the histograms of the footprints
+    along the rows, updating them with the left and right edges of the
+    footprint only, so that the cost grows with its perimeter instead of its
+    area, and search the rank in two-level histograms of the distinct values
+    of the image. The other data types partition the taps of bands of rows.
+    Both methods work in buffers of about block_bytes.
+
+    :param image: Image to filter, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Footprint, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param rank: Rank of the value in the footprint, negative ranks counting from the maximum
+    :type rank: int
+    :param block_bytes: Size of the working buffers, defaults to 16 MiB
+    :type block_bytes: int
+    :raises ValueError: image with less than two axes, empty footprint, rank outside the footprint
+    :return: the filtered image, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    image = np.asarray(image)
+    if image.ndim < 2:
+        raise ValueError("Image must have at least two axes")
+    rows, cols = _footprint(kernel)
+    if not -rows.size <= rank < rows.size:
+        raise ValueError(f"Rank must be in [{-rows.size}, {rows.size})")
+    rank = rank % rows.size
+    if image.dtype in HISTOGRAM_DTYPES:
+        return _histogram(image, rows, cols, rank, block_bytes)
+    return _partition(image, rows, cols, rank, block_bytes)
+
+def percentile(image, kernel, q, block_bytes=2**24):
+    r"""Replaces each pixel by the q-th percentile of the pixels under the
+    footprint, the value of nearest rank without interpolation, see
+    :func:`rank_filter`.
+
+    :param image: Image to filter, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Footprint, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param q: Percentile, between 0 and 100
+    :type q: float
+    :param block_bytes: Size of the working buffers, defaults to 16 MiB
+    :type block_bytes: int
+    :raises ValueError: percentile outside [0, 100]
+    :return: the filtered image, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    if not 0 <= q <= 100:
+        raise ValueError("Percentile must be between 0 and 100")
+    size = _footprint(kernel)[0].size
+    return rank_filter(image, kernel, int(round(q / 100 * (size - 1))), block_bytes)
+
+def median(image, kernel, block_bytes=2**24):
+    r"""Median filter, the lower middle value of the pixels under the footprint
+    for an even number of taps, see :func:`rank_filter`.
+
+    :param image: Image to filter, leading axes are batched
+    :type image: np.ndarray
+    :param kernel: Footprint, the non-zero coefficients of the kernel
+    :type kernel: Kernel|np.ndarray
+    :param block_bytes: Size of the working buffers, defaults to 16 MiB
+    :type block_bytes: int
+    :return: the filtered image, with the dtype of the image
+    :rtype: np.ndarray
+    """
+    return rank_filter(image, kernel, (_footprint(kernel)[0].size - 1) // 2, block_bytes)
@@ -2,6 +2,7 @@
 import numpy as np
 
 from .objs.Kernel import Kernel
+from .objs.KernelBank import KernelBank
 
 def _shapes_generator(
         size=(3,3),
@@ -44,11 +45,30 @@ def circle(size=(21,21),scale=(1,1), mode="fill"):
     :return: a Kernel object
     :rtype: Kernel
     """
-    return _shapes_generator(
-        size,scale,mode=mode,
-        condition =
-        lambda x_c,y_c,scale:(np.sqrt((x_c/(1+scale[0]))**2+(y_c/(1+scale[1]))**2<=1))
-    )
+    return _shapes_generator(size,scale,mode=mode,condition=_circle)
+
+def _circle(x_c, y_c, scale):
+    return np.sqrt((x_c/(1+scale[0]))**2+(y_c/(1+scale[1]))**2)<=1
+
+def circle_batch(size=(21,21), scales=((1,1),), mode="fill") -> KernelBank:
+    r"""Returns the circle kernels of many scales at once, equal to
+    :func:`circle` for each of them, the coordinates grid being shared
+    by the whole sweep.
+
+    :param size: Tuple defining the size of the kernels respectively
+        in the x and y direction, defaults to (21,21)
+    :type size: (int, int)
+    :param scales: The (width, height) scales of every circle, or one
+        scale for both, defaults to ((1,1),)
+    :type scales: np.ndarray
+    :param mode: Filled circles or their outlines, defaults to "fill"
+    :type mode: "fill"|"outline"
+    :return: a KernelBank object of (N, size[1], size[0]) coefficients
+    :rtype: KernelBank
+    """
+    scales = np.asarray(scales)
+    scales = np.stack([scales, scales], axis=-1) if scales.ndim == 1 else scales
+    return KernelBank(_shapes_generator(size, scales[:, :, None, None].swapaxes(0, 1), _circle, mode))
 
 @Kernel.decorator
 def diamond(size=(21,21),scale=(1,1), mode="fill"):
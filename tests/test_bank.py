@@ -0,0 +1,23 @@
+import kerpy, numpy as np
+from kerpy.objs.KernelBank import KernelBank
+
+def test_bank_matches_kernels():
+    kernels = [kerpy.diff.sobel(), kerpy.diff.laplacian(), kerpy.processing.gaussian((9,9),(2,2)), kerpy.processing.gaussian((4,6),(1,2))]
+    bank = KernelBank(kernels)
+    assert bank.numpy.shape == (4, 9, 9)
+    image = np.random.default_rng(0).random((2, 37, 41))
+    for method in ["gemm", "fft"]:
+        responses = bank.apply(image, method)
+        assert responses.shape == (2, 4, 37, 41)
+        for index, ker in enumerate(kernels):
+            assert np.allclose(bank[index].numpy, ker.numpy)
+            assert np.allclose(responses[:, index], ker.apply(image, method="direct"))
+
+def test_bank_asymmetric_support():
+    kernels = [kerpy.diff.finite(), kerpy.Kernel(np.array([[1., 2.], [0, 0]])), kerpy.Kernel(np.array([[0, 1., 2.], [0, 0, 3.]]))]
+    image = np.random.default_rng(1).random((23, 29))
+    for bank in [KernelBank([ker]) for ker in kernels] + [KernelBank(kernels)]:
+        for method in ["auto", "gemm", "fft"]:
+            responses = bank.apply(image, method)
+            for index in range(len(bank)):
+                assert np.allclose(responses[index], bank[index].apply(image, method="direct"))
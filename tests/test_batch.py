@@ -0,0 +1,10 @@
+import kerpy, numpy as np
+from kerpy.batch import convolve_batch
+
+def test_convolve_batch():
+    stack = np.random.default_rng(0).random((5, 24, 31))
+    kernels = [kerpy.diff.laplacian(), kerpy.processing.gaussian((9,9),(2,2), factored=True), kerpy.shapes.circle((5,5))]
+    responses = convolve_batch(stack, kernels, workers=2)
+    assert responses.shape == (5, 3, 24, 31)
+    for index, ker in enumerate(kernels):
+        assert np.allclose(responses[:, index], ker.apply(stack))
@@ -0,0 +1,108 @@
+from threading import Thread
+import kerpy, numpy as np
+from kerpy.convolution import convolve, convolve_tiled, cost
+
+def test_methods_agree():
+    image = np.random.default_rng(0).random((32, 27))
+    ker = kerpy.processing.gaussian((5,7),(2,1))
+    for mode in ["full", "same", "valid"]:
+        direct = convolve(image, ker, mode, "direct")
+        assert np.allclose(direct, convolve(image, ker, mode, "separable"))
+        assert np.allclose(direct, convolve(image, ker, mode, "fft"))
+    ker = kerpy.diff.laplacian()
+    assert np.allclose(convolve(image, ker, method="separable"), convolve(image, ker, method="direct"))
+
+def test_matches_numpy_convolve():
+    image = np.random.default_rng(0).random((1, 40))
+    ker = kerpy.Kernel(np.array([[1., -2., 3., 0.5]]))
+    full = np.convolve(image[0], ker.numpy[0], "full")
+    assert np.allclose(ker.apply(image, "full", "fft")[0], full)
+    assert np.allclose(ker.apply(image, "same", "fft")[0], full[1:41])
+    assert np.allclose(ker.apply(image, "valid", "fft")[0], np.convolve(image[0], ker.numpy[0], "valid"))
+
+def test_auto_method():
+    for ker, expected in [(kerpy.diff.sobel(), "winograd"), (kerpy.diff.laplacian(), "direct"), (kerpy.processing.gaussian((21,21),(5,5)), "fft")]:
+        costs = cost((2160, 3840), ker)
+        assert min(costs, key=costs.get) == expected
+
+def test_plan():
+    stack = np.random.default_rng(0).random((3, 20, 30))
+    ker = kerpy.shapes.circle((7,7),(2,2))
+    plan = ker.plan(stack.shape, stack.dtype, "full")
+    assert plan is ker.plan((20, 30), stack.dtype, "full")
+    assert all(n in (2**i*3**j*5**k for i in range(6) for j in range(4) for k in range(3)) for n in plan.fft_shape)
+    expected = convolve(stack, ker, "full", "direct")
+    assert np.allclose(plan.execute(stack[0]), expected[0])
+    assert np.allclose(plan.execute_batch(stack), expected)
+
+def test_convolve_tiled(tmp_path):
+    image = np.random.default_rng(0).random((61, 47))
+    np.save(tmp_path / "image.npy", image)
+    ker = kerpy.processing.gaussian((9,5),(3,1))
+    for mode in ["full", "same", "valid"]:
+        out = convolve_tiled(str(tmp_path / "image.npy"), ker, str(tmp_path / "out.npy"), mode, tile_bytes=20000)
+        assert isinstance(out, np.memmap)
+        assert np.allclose(np.load(tmp_path / "out.npy"), convolve(image, ker, mode, "direct"))
+
+def test_workers():
+    image = np.random.default_rng(0).random((2, 53, 41))
+    for ker in [kerpy.diff.sobel(), kerpy.processing.gaussian((9,5),(3,1))]:
+        for method in ["direct", "separable", "fft"]:
+            assert np.allclose(ker.apply(image, "full", method, workers=3), ker.apply(image, "full", method))
+
+def test_concurrent_workers():
+    ker, image = kerpy.processing.gaussian((7,7),(2,2)), np.random.default_rng(0).random((128, 128))
+    expected, results = ker.apply(image), {}
+    def run(workers):
+        results[workers] = all(np.allclose(ker.apply(image, workers=workers), expected) for _ in range(10))
+    threads = [Thread(target=run, args=(workers,)) for workers in range(2, 14)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 12 and all(results.values())
+
+def test_complex_kernel():
+    image = np.random.default_rng(0).random((2, 33, 29))
+    ker = kerpy.diff.sobel()
+    parts = {key : kerpy.Kernel(value).apply(image, method="direct") for key, value in ker.to_reals().items()}
+    for method in ["direct", "separable", "fft"]:
+        response = ker.apply(image, method=method)
+        assert np.allclose(response, parts["x"] + 1j * parts["y"])
+        assert np.allclose(ker.apply(image, method=method, output="magnitude"), np.hypot(parts["x"], parts["y"]))
+        assert np.allclose(ker.apply(image, method=method, output="orientation", workers=2), np.arctan2(parts["y"], parts["x"]))
+    band_bytes, kerpy.convolution.BAND_BYTES = kerpy.convolution.BAND_BYTES, 2000
+    try:
+        for method in ["direct", "separable", "fft", "winograd"]:
+            for mode in ["full", "same", "valid"]:
+                assert np.allclose(ker.apply(image, mode, method, output="magnitude"), np.abs(ker.apply(image, mode, "direct")))
+    finally:
+        kerpy.convolution.BAND_BYTES = band_bytes
+
+def test_winograd():
+    image = np.random.default_rng(0).random((2, 17, 23)).astype(np.float32)
+    for ker in [kerpy.diff.sobel(), kerpy.processing.unsharp(), kerpy.Kernel(np.arange(9.).reshape(3, 3))]:
+        for mode in ["full", "same", "valid"]:
+            out = convolve(image, ker, mode, "winograd")
+            assert out.dtype == np.result_type(ker.dtype, np.float32)
+            assert np.allclose(out, convolve(image, ker, mode, "direct"), atol=1e-4)
+    try:
+        convolve(image, kerpy.processing.gaussian((5,5),(1,1)), method="winograd")
+        assert False
+    except ValueError:
+        pass
+
+def test_box():
+    image = np.random.default_rng(0).integers(0, 256, (2, 31, 40)).astype(np.uint8)
+    for ker in [kerpy.processing.mean((5,7)), kerpy.shapes.square((21,21),(8,3)), kerpy.Kernel(np.full((2,3), 2))]:
+        for mode in ["full", "same", "valid"]:
+            expected = convolve(image.astype(np.float64), ker, mode, "direct")
+            out = convolve(image, ker, mode, "box")
+            assert out.dtype == expected.dtype and np.allclose(out, expected)
+    costs = cost((2160, 3840), kerpy.processing.mean((65,65)))
+    assert min(costs, key=costs.get) == "box"
+    try:
+        convolve(image, kerpy.processing.gaussian((5,5),(1,1)), method="box")
+        assert False
+    except ValueError:
+        pass
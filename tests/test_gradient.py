@@ -0,0 +1,12 @@
+import kerpy, numpy as np
+from kerpy.gradient import polar
+
+def test_polar():
+    image = (np.random.default_rng(0).random((47, 53)) * 255).astype(np.uint8)
+    for ker in [kerpy.diff.sobel(), kerpy.diff.prewitt(), kerpy.diff.robert_cross()]:
+        magnitude, direction = polar(image, ker, block_bytes=3000)
+        assert magnitude.dtype == np.float32 and direction.dtype == np.uint8
+        response = ker.apply(image)
+        assert np.allclose(magnitude, np.abs(response), rtol=1e-5, atol=1e-3)
+        angle = np.degrees(np.arctan2(response.imag, response.real)) % 180
+        assert np.all(direction == np.round(angle / 45).astype(np.uint8) % 4)
@@ -0,0 +1,118 @@
+import sys
+from threading import Barrier, Thread
+import kerpy, numpy as np
+from kerpy.objs.Kernel import Kernel
+
+def test_separate():
+    ker : Kernel = kerpy.processing.gaussian((9,7),(2,1))
+    column, row = ker.separate()
+    assert np.allclose(np.outer(column, row), ker.numpy)
+    assert kerpy.diff.laplacian().separate() is None
+
+def test_low_rank():
+    ker : Kernel = kerpy.diff.sobel()
+    assert np.allclose(sum(np.outer(c, r) for c, r in ker.low_rank()), ker.numpy)
+    ker = kerpy.shapes.circle((21,21),(8,8))
+    terms = ker.low_rank(tol=0.1)
+    assert len(terms) < len(ker.low_rank())
+    error = np.linalg.norm(sum(np.outer(c, r) for c, r in terms) - ker.numpy)
+    assert error <= 0.1 * np.linalg.norm(ker.numpy)
+
+def test_stride():
+    base = np.arange(1., 10.).reshape(3, 3)
+    ker = Kernel(base.copy()).stride(7)
+    assert ker.shape == (31, 31) and ker.nnz == 9
+    assert len(ker.low_rank()) == 2
+    image = np.random.default_rng(0).random((40, 45))
+    dense = np.zeros((31, 31))
+    dense[7::8, 7::8] = base
+    assert np.allclose(ker.apply(image, method="direct"), Kernel(dense).apply(image, method="fft"))
+    assert np.array_equal(ker.numpy, dense)
+    assert np.array_equal(Kernel(base.copy()).stride(1).stride(3).numpy, dense)
+
+def test_sparse():
+    ker = kerpy.shapes.circle((41,41),(19,19),mode="outline")
+    assert isinstance(ker, kerpy.SparseKernel) and isinstance(kerpy.diff.central(), kerpy.SparseKernel)
+    assert not isinstance(kerpy.processing.gaussian(), kerpy.SparseKernel)
+    image = np.random.default_rng(0).random((50, 60))
+    sparse = ker.apply(image, "full", "direct")
+    assert ker._numpy is None and ker.nnz < 0.1 * 41 * 41
+    assert np.allclose(sparse, Kernel(ker.numpy.copy()).apply(image, "full", "fft"))
+    assert np.array_equal(Kernel(ker.numpy).to_sparse().numpy, ker.numpy)
+
+def test_transforms():
+    base = np.arange(1., 13.).reshape(3, 4)
+    ker = Kernel(base.copy()).pad(1, 2, 0, 3).rot90().flip().stride(2)
+    expected = np.zeros((4, 9))
+    expected[1:, 3:7] = base
+    expected = np.flip(np.rot90(expected))
+    dense = np.zeros((29, 14))
+    dense[2::3, 2::3] = expected
+    assert ker.shape == dense.shape and ker._numpy is None
+    assert np.allclose(sum(np.outer(c, r) for c, r in ker.low_rank()), dense)
+    image = np.random.default_rng(0).random((20, 40))
+    assert np.allclose(ker.apply(image, method="direct"), Kernel(dense).apply(image, method="fft"))
+    assert ker._numpy is None and np.array_equal(ker.numpy, dense)
+    assert ker._transform is None
+    assert np.array_equal(Kernel(base.copy()).pad(1, 1, 1, 1, value=-1).flip().numpy, np.pad(base, 1, constant_values=-1)[::-1, ::-1])
+
+def test_concurrent_materialize():
+    base, errors = np.random.default_rng(0).random((30, 30)), []
+    def read(ker, barrier):
+        barrier.wait()
+        try:
+            for _ in range(3):
+                assert ker.shape == ker.numpy.shape and ker._digest() and ker._taps()[0].size == ker.nnz
+        except Exception as error: # pylint: disable=broad-except
+            errors.append(error)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(100):
+            for ker in [Kernel(base.copy()).pad(1, 1, 1, 1, value=2).stride(1), Kernel(base.copy()).pad(1, 1, 1, 1).stride(1),
+                kerpy.SparseKernel((30, 30), *np.nonzero(base > 0.5), base[base > 0.5])]:
+                barrier = Barrier(6)
+                threads = [Thread(target=read, args=(ker, barrier)) for _ in range(6)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+
+def test_freeze():
+    ker = kerpy.processing.gaussian((7,7),(2,2))
+    frozen = ker.freeze()
+    assert frozen.numpy is ker.numpy and not frozen.numpy.flags.writeable
+    same = kerpy.FrozenKernel(kerpy.processing.gaussian((7,7),(2,2)))
+    assert frozen == same and hash(frozen) == hash(same) and len({frozen, same}) == 1
+    assert frozen != kerpy.processing.gaussian((7,7),(2,3)).freeze()
+    assert np.all((frozen == frozen.numpy).numpy)
+    padded = frozen.pad(1, 1, 1, 1)
+    assert padded.shape == (9, 9) and frozen.shape == (7, 7) and not isinstance(padded, kerpy.FrozenKernel)
+    try:
+        frozen.numpy = np.zeros((3, 3))
+        assert False
+    except AttributeError:
+        pass
+
+def test_memoize():
+    cache = kerpy.memoize(max_size=8)
+    try:
+        first = kerpy.processing.gaussian((31,31),(5,5))
+        assert kerpy.processing.gaussian([31,31], std=(5,5)) is first and isinstance(first, kerpy.FrozenKernel)
+        assert kerpy.diff.sobel() is kerpy.diff.sobel() and kerpy.processing.sharpen() is not None
+        assert cache.info()["hits"] >= 2 and cache.info()["size"] <= 8
+        factored = kerpy.processing.gaussian((201,201),(30,30),factored=True)
+        assert isinstance(factored, kerpy.SeparableKernel) and isinstance(factored, kerpy.FrozenKernel)
+        assert factored._numpy is None and factored.low_rank()[0][0].size == 201
+        outline = kerpy.shapes.circle((41,41),(20,20),mode="outline")
+        assert isinstance(outline, kerpy.SparseKernel) and isinstance(outline, kerpy.FrozenKernel)
+        image = np.random.default_rng(0).random((50, 60))
+        assert np.allclose(outline.apply(image), Kernel(np.array(outline.numpy)).apply(image, method="direct"))
+        assert outline._sparse is not None and not outline.numpy.flags.writeable
+        assert kerpy.shapes.circle((41,41),(20,20),mode="outline") is outline and hash(outline) == hash(outline.to_sparse().freeze())
+    finally:
+        kerpy.memoize(max_size=0)
+    assert kerpy.processing.gaussian((31,31),(5,5)) is not first and not cache.info()["size"]
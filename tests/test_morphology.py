@@ -0,0 +1,103 @@
+import kerpy, numpy as np
+
+def naive(image, ker, op, fill, sign):
+    h, w = ker.shape
+    padded = np.pad(image, ((h, h), (w, w)), constant_values=fill)
+    out = np.full(image.shape, fill, image.dtype)
+    for i, j in zip(*np.nonzero(ker)):
+        i, j = sign * (i - (h - 1) // 2), sign * (j - (w - 1) // 2)
+        out = op(out, padded[h + i:h + i + image.shape[0], w + j:w + j + image.shape[1]])
+    return out
+
+def test_erode_dilate():
+    rng = np.random.default_rng(0)
+    kernels = [kerpy.shapes.square((7,5), (3,2)).numpy, np.ones((1,9)), np.ones((4,1)), kerpy.shapes.circle((9,9), (4,4)).numpy]
+    for ker in kernels:
+        for image in [(rng.random((25, 30)) * 255).astype(np.uint8), rng.random((25, 30)), rng.random((25, 30)) > 0.8]:
+            low, high = kerpy.morphology._limits(image.dtype)
+            eroded, dilated = naive(image, ker, np.minimum, high, 1), naive(image, ker, np.maximum, low, -1)
+            for method in kerpy.morphology.cost(ker):
+                assert np.array_equal(kerpy.morphology.erode(image, ker, method), eroded)
+                assert np.array_equal(kerpy.morphology.dilate(image, ker, method), dilated)
+    binary = rng.random((3, 20, 20)) > 0.9
+    ker = kerpy.shapes.diamond((5,5), (2,2))
+    assert np.array_equal(kerpy.morphology.dilate(binary, ker), kerpy.convolution.convolve(binary * 1., ker) > 0.5)
+    try:
+        kerpy.morphology.erode(binary, ker, "van_herk")
+        assert False
+    except ValueError:
+        pass
+
+def test_derived_operators():
+    image = (np.random.default_rng(1).random((30, 30)) * 255).astype(np.uint8)
+    ker = kerpy.shapes.square((5,5), (2,2))
+    opened, closed = kerpy.morphology.open(image, ker), kerpy.morphology.close(image, ker)
+    assert np.all(opened <= image) and np.all(closed >= image)
+    assert np.array_equal(kerpy.morphology.open(opened, ker), opened)
+    assert np.array_equal(kerpy.morphology.tophat(image, ker), image - opened)
+    assert np.array_equal(kerpy.morphology.tophat(image, ker, black=True), closed - image)
+    assert np.array_equal(kerpy.morphology.gradient(image, ker),
+                          kerpy.morphology.dilate(image, ker) - kerpy.morphology.erode(image, ker))
+
+def test_sparse_duplicate_taps():
+    image = np.arange(25).reshape(5, 5)
+    assert np.array_equal(kerpy.morphology.erode(image, kerpy.SparseKernel((3,3), [1, 0], [1, 0], [1, 0]))[2], image[2])
+    image = (np.random.default_rng(2).random((30, 40)) * 255).astype(np.uint8)
+    taps = ([1, 0, 1, 2, 2], [1, 0, 2, 0, 0], [1, 0, 1, 1, 1])
+    dense = kerpy.SparseKernel((3,3), *taps).numpy
+    for operator in [kerpy.morphology.erode, kerpy.morphology.dilate]:
+        assert np.array_equal(operator(image, kerpy.SparseKernel((3,3), *taps)), operator(image, dense))
+
+def test_decompose():
+    terms, error = kerpy.shapes.diamond((21,21), (8,8)).decompose_morphological()
+    assert error == 0 and len(terms) == 1 and len(terms[0]) == 8
+    assert all(np.array_equal(factor.numpy, kerpy.shapes.diamond((3,3), (1,1)).numpy) for factor in terms[0])
+    terms, error = kerpy.shapes.square((21,21), (6,4)).decompose_morphological()
+    assert error == 0 and [[factor.shape for factor in term] for term in terms] == [[(1, 9), (13, 1)]]
+    image = (np.random.default_rng(2).random((40, 50)) * 255).astype(np.uint8)
+    for ker in [kerpy.shapes.diamond((20,22), (6,6)), kerpy.shapes.circle((21,17), (8,6)), kerpy.shapes.cross((15,15), (7,7))]:
+        for op, fill, sign, function in [(np.minimum, 255, 1, kerpy.morphology.erode), (np.maximum, 0, -1, kerpy.morphology.dilate)]:
+            assert np.array_equal(function(image, ker, "decompose"), naive(image, ker.numpy, op, fill, sign))
+    circle = kerpy.shapes.circle((45,45), (20,20))
+    terms, error = circle.decompose_morphological(0.1)
+    assert 0 < error <= 0.1 and kerpy.morphology.cost(circle, 0.1)["decompose"] < 0.05 * circle.nnz
+
+def test_bits():
+    rng = np.random.default_rng(3)
+    for width in [1, 64, 100, 200]:
+        image = rng.random((2, 15, width)) > 0.3
+        words = kerpy.morphology.pack(image)
+        assert words.shape == (2, 15, -(-width // 64)) and np.array_equal(kerpy.morphology.unpack(words, width), image)
+        for ker in [kerpy.shapes.circle((9,9), (4,4)), kerpy.shapes.diamond((20,22), (6,6)), np.ones((1, 150))]:
+            eroded, dilated = kerpy.morphology.erode(image, ker, "direct"), kerpy.morphology.dilate(image, ker, "direct")
+            assert np.array_equal(kerpy.morphology.erode(image, ker, "bits"), eroded)
+            assert np.array_equal(kerpy.morphology.dilate(image, ker, "bits"), dilated)
+            assert np.array_equal(kerpy.morphology.erode_packed(words, ker, width), kerpy.morphology.pack(eroded))
+            assert np.array_equal(kerpy.morphology.dilate_packed(words, ker, width), kerpy.morphology.pack(dilated))
+    assert np.array_equal(kerpy.morphology.unpack(kerpy.shapes.cross((5,5), (2,2)).packbits(), 5), kerpy.shapes.cross((5,5), (2,2)).numpy != 0)
+    try:
+        kerpy.morphology.erode(image * 1., ker, "bits")
+        assert False
+    except ValueError:
+        pass
+
+def test_lut():
+    image = np.random.default_rng(4).random((2, 30, 40)) > 0.4
+    codes = kerpy.morphology.codes(image)
+    assert codes.dtype == np.uint16 and np.array_equal(codes & 16 != 0, image)
+    for ker in [kerpy.shapes.square((3,3), (1,1)), kerpy.shapes.cross((3,3)), np.array([[0, 0, 1], [1, 1, 0], [0, 0, 0]])]:
+        assert np.array_equal(kerpy.morphology.erode(image, ker, "lut"), kerpy.morphology.erode(image, ker, "direct"))
+        assert np.array_equal(kerpy.morphology.dilate(image, ker, "lut"), kerpy.morphology.dilate(image, ker, "direct"))
+    hit, miss = kerpy.morphology.THINNING[0]
+    expected = kerpy.morphology.erode(image, hit, "direct") & kerpy.morphology.erode(~image, miss, "direct")
+    assert np.array_equal(kerpy.morphology.hit_or_miss(image, hit, miss)[..., 1:-1, 1:-1], expected[..., 1:-1, 1:-1])
+    rectangle = np.zeros((14, 24), bool)
+    rectangle[2:12, 2:20] = True
+    thinned = kerpy.morphology.thin(rectangle)
+    assert np.all(thinned <= rectangle) and 0 < thinned.sum() < 40
+    assert np.array_equal(kerpy.morphology.thin(thinned), thinned)
+    try:
+        kerpy.morphology.erode(image, kerpy.shapes.square((5,5), (2,2)), "lut")
+        assert False
+    except ValueError:
+        pass
@@ -5,4 +5,27 @@ from kerpy.objs.Kernel import Kernel
 def test_laplacian_sharpen_relation():
     l : Kernel = kerpy.diff.laplacian()
     l.numpy[1,1] += 1
-    assert np.sum((kerpy.processing.sharpen()==l).numpy) == 9
\ No newline at end of file
+    assert np.sum((kerpy.processing.sharpen()==l).numpy) == 9
+
+def test_factored_generators():
+    for size, std in [((3,3),(1,1)), ((9,5),(3,1))]:
+        ker = kerpy.processing.gaussian(size, std, factored=True)
+        assert ker.shape == kerpy.processing.gaussian(size, std).numpy.shape
+        assert ker.separate() is not None and ker._numpy is None
+        assert np.allclose(ker.numpy, kerpy.processing.gaussian(size, std).numpy)
+        assert np.allclose(kerpy.processing.mean(size, factored=True).numpy, kerpy.processing.mean(size).numpy)
+
+def test_gaussian_batch():
+    stds = [(1, 1), (2, 0.5), (3.5, 3.5)]
+    bank = kerpy.processing.gaussian_batch((9,7), stds)
+    assert bank.numpy.shape == (3, 7, 9)
+    for index, std in enumerate(stds):
+        assert np.allclose(bank[index].numpy, kerpy.processing.gaussian((9,7), std).numpy)
+    assert np.allclose(kerpy.processing.gaussian_batch((5,5), [2.]).numpy[0], kerpy.processing.gaussian((5,5), (2,2)).numpy)
+
+def test_gaussian_iir():
+    image = np.random.default_rng(0).random((2, 60, 70))
+    for std in [(2, 2), (6, 3)]:
+        size = (2 * int(np.ceil(4 * std[0])) + 1, 2 * int(np.ceil(4 * std[1])) + 1)
+        expected = kerpy.processing.gaussian(size, std).apply(image)
+        assert np.abs(kerpy.processing.gaussian_iir(image, std) - expected).max() < 0.01 * expected.max()
@@ -0,0 +1,32 @@
+import kerpy, numpy as np
+
+def blurred(image, std):
+    size = 2 * int(np.ceil(kerpy.pyramid.TRUNCATE * std)) + 1
+    padded = np.pad(image, size // 2, mode="reflect")
+    return kerpy.convolution.convolve(padded, kerpy.processing.gaussian((size, size), (std, std)), mode="valid")
+
+def test_gaussian_pyramid():
+    image = np.random.default_rng(0).random((67, 90))
+    pyramid = kerpy.pyramid.gaussian_pyramid(image)
+    assert [level.shape for level in pyramid] == [(67, 90), (34, 45), (17, 23), (9, 12), (5, 6), (3, 3), (2, 2), (1, 1)]
+    assert all(level.base is pyramid[0].base for level in pyramid)
+    assert np.allclose(pyramid[1], blurred(image, 1.0)[::2, ::2])
+    assert np.allclose(pyramid[2], blurred(pyramid[1], 1.0)[::2, ::2])
+    batch = np.stack([image, image[::-1]])
+    assert np.allclose(kerpy.pyramid.gaussian_pyramid(batch, 3)[2][1], kerpy.pyramid.gaussian_pyramid(image[::-1], 3)[2])
+
+def test_laplacian_pyramid():
+    image = np.random.default_rng(1).random((2, 40, 33)).astype(np.float32)
+    pyramid = kerpy.pyramid.laplacian_pyramid(image, 4)
+    assert len(pyramid) == 4 and pyramid[0].dtype == np.float32
+    assert np.allclose(pyramid[-1], kerpy.pyramid.gaussian_pyramid(image, 4)[-1])
+    assert np.allclose(kerpy.pyramid.collapse(pyramid), image, atol=1e-5)
+
+def test_scale_space():
+    image = np.random.default_rng(2).random((48, 64))
+    space = kerpy.pyramid.scale_space(image, 3, scales=2)
+    assert [octave.shape for octave in space] == [(5, 48, 64), (5, 24, 32), (5, 12, 16)]
+    for level in range(5):
+        std = np.sqrt((1.6 * 2**(level / 2))**2 - 0.5**2)
+        assert np.allclose(space[0][level], blurred(image, std), atol=1e-4)
+    assert np.array_equal(space[1][0], space[0][2, ::2, ::2])
@@ -0,0 +1,35 @@
+import kerpy, numpy as np
+
+def naive(image, ker, rank):
+    h, w = ker.shape
+    top, left = (h - 1) // 2, (w - 1) // 2
+    padded = np.pad(image, ((top, h - 1 - top), (left, w - 1 - left)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, ker.shape)[..., ker != 0]
+    return np.sort(windows, axis=-1)[..., rank]
+
+def test_rank_filter():
+    rng = np.random.default_rng(0)
+    for image in [(rng.random((31, 40)) * 255).astype(np.uint8), (rng.random((31, 40)) * 4000).astype(np.uint16), rng.random((31, 40))]:
+        for ker in [kerpy.shapes.circle((9,9), (3,3)).numpy, kerpy.shapes.diamond((6,8), (3,3)).numpy, np.ones((1,4))]:
+            size = np.count_nonzero(ker)
+            for rank in [0, size // 3, -1]:
+                assert np.array_equal(kerpy.rank.rank_filter(image, ker, rank, block_bytes=4096), naive(image, ker, rank))
+            assert np.array_equal(kerpy.rank.median(image, ker), naive(image, ker, (size - 1) // 2))
+    batch = (rng.random((2, 20, 20)) * 255).astype(np.uint8)
+    ker = kerpy.shapes.square((3,3), (1,1))
+    assert np.array_equal(kerpy.rank.percentile(batch, ker, 100), kerpy.rank.rank_filter(batch, ker, 8))
+    assert np.array_equal(kerpy.rank.percentile(batch, ker, 0)[1], naive(batch[1], ker.numpy, 0))
+    try:
+        kerpy.rank.rank_filter(batch, ker, 9)
+        assert False
+    except ValueError:
+        pass
+
+def test_sparse_duplicate_taps():
+    rng = np.random.default_rng(1)
+    taps = ([1, 0, 1, 2, 2, 0], [1, 0, 2, 0, 0, 2], [1, 0, 1, 1, 1, 3])
+    dense = kerpy.SparseKernel((3,3), *taps).numpy
+    assert np.count_nonzero(dense) == 4
+    for image in [(rng.random((31, 40)) * 255).astype(np.uint8), rng.random((31, 40))]:
+        for rank in [0, 1, -1]:
+            assert np.array_equal(kerpy.rank.rank_filter(image, kerpy.SparseKernel((3,3), *taps), rank), naive(image, dense, rank))
@@ -0,0 +1,7 @@
+import kerpy, numpy as np
+
+def test_circle_batch():
+    for mode in ["fill", "outline"]:
+        bank = kerpy.shapes.circle_batch((21,17), [(2, 2), (4, 7), (9, 9)], mode)
+        for index, scale in enumerate([(2, 2), (4, 7), (9, 9)]):
+            assert np.array_equal(bank.numpy[index], kerpy.shapes.circle((21,17), scale, mode).numpy)